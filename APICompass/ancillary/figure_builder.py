@@ -0,0 +1,149 @@
+import colorsys
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+# Colores de las comparaciones; a partir del décimo se generan
+BASE_COLORS = ("green", "blue", "orange", "red", "purple", "brown", "pink", "gray", "olive", "cyan")
+_GOLDEN_ANGLE = 0.381966011250105
+
+# Umbrales (s) y sufijos de format_time_tooltip
+_TOOLTIP_LIMITS_S = np.array([60, 3600, 86400, 2592000], dtype=np.float64)
+_TOOLTIP_DIVISORS_S = np.array([1, 60, 3600, 86400, 2592000], dtype=np.float64)
+_TOOLTIP_SUFFIXES = ("s", "min", "h", "days", "months")
+
+
+def trace(x: np.ndarray, y: np.ndarray, trace_type: str = "scatter", **props) -> dict:
+    """
+    Plain dict for a plotly trace, keeping x and y as NumPy arrays.
+
+    Args:
+        x (np.ndarray): The x values.
+        y (np.ndarray): The y values.
+        trace_type (str): The plotly trace type ('scatter', 'scattergl', ...).
+        **props: Any other trace property, as plotly expects it (line=dict(...), fill=...).
+
+    Returns:
+        dict: The trace, ready for build_figure.
+    """
+    return dict(type=trace_type, x=np.asarray(x), y=np.asarray(y), **props)
+
+
+def build_figure(traces: Iterable[dict], layout: Optional[dict] = None) -> "go.Figure":
+    """
+    Builds a figure from trace dicts without running plotly's per-property validation
+    on the traces, so large arrays are stored as they are instead of being walked
+    and copied.
+
+    Skipping validation relies on plotly's private _validate flag. If the installed
+    plotly no longer has it, the figure is built through the public constructor,
+    validated as usual. The layout is small and is always validated, so named
+    templates resolve, and the returned figure validates every later update.
+
+    Args:
+        traces (Iterable[dict]): Trace dicts, e.g. from trace().
+        layout (Optional[dict]): Layout properties.
+
+    Returns:
+        go.Figure: The figure.
+    """
+    import plotly.graph_objects as go
+
+    traces = list(traces)
+    fig = _unvalidated_figure(go, traces)
+    if fig is None:
+        fig = go.Figure(data=traces)
+    if layout:
+        fig.update_layout(**layout)
+    return fig
+
+
+def _unvalidated_figure(go, traces: List[dict]) -> Optional["go.Figure"]:
+    # Figura sin validar las trazas, o None si este plotly ya no tiene el flag privado
+    try:
+        fig = go.Figure(data=traces, _validate=False)
+    except (TypeError, ValueError):
+        return None
+    objs = (fig, fig.layout, *fig.data)
+    if not all(getattr(obj, "_validate", None) is False for obj in objs):
+        return None
+
+    # a partir de aquí plotly vuelve a validar cada cambio
+    for obj in objs:
+        obj._validate = True
+    return fig
+
+
+def palette(n: int) -> List[str]:
+    """
+    n distinct colors: BASE_COLORS first, then hues spaced by the golden angle,
+    so neighbouring curves never share a color however many there are.
+
+    Args:
+        n (int): Number of colors.
+
+    Returns:
+        List[str]: Named or hex colors, usable in trace lines and in fill_color.
+    """
+    colors = list(BASE_COLORS[:n])
+    for i in range(n - len(colors)):
+        # tres niveles de saturación/brillo para separar tonos cercanos
+        r, g, b = colorsys.hsv_to_rgb((i * _GOLDEN_ANGLE) % 1.0, 0.65 + 0.15 * (i % 3), 0.85 - 0.15 * (i % 3))
+        colors.append(f"#{int(r * 255):02x}{int(g * 255):02x}{int(b * 255):02x}")
+    return colors
+
+
+def fill_color(color: str, alpha: float) -> str:
+    """
+    rgba() string of a named or hex color with the given opacity.
+
+    Args:
+        color (str): Any matplotlib color.
+        alpha (float): The opacity, between 0 and 1.
+
+    Returns:
+        str: The color as 'rgba(r,g,b,alpha)'.
+    """
+    from matplotlib.colors import to_rgba
+    return f"rgba({','.join(map(str, [int(c * 255) for c in to_rgba(color)[:3]]))},{alpha})"
+
+
+def time_tooltips(t_ms: np.ndarray) -> np.ndarray:
+    """
+    Hover labels for many instants, in the format of CapacityPlotHelper.format_time_tooltip.
+
+    Each instant is scaled to its unit and rounded in one vectorized pass (whole
+    seconds below a minute, one decimal above), and each distinct label is
+    formatted only once. Values that sit on a rounding tie are rounded with
+    Python's own formatting, so the labels match format_time_tooltip exactly.
+
+    Args:
+        t_ms (np.ndarray): Instants in milliseconds.
+
+    Returns:
+        np.ndarray: The labels, as an object array aligned with t_ms.
+    """
+    seconds = np.asarray(t_ms, dtype=np.float64) / 1000
+    unit = np.searchsorted(_TOOLTIP_LIMITS_S, seconds, side="right")
+    scaled = seconds / _TOOLTIP_DIVISORS_S[unit]
+
+    # 1) redondeo a las décimas mostradas (a segundos enteros por debajo del minuto)
+    digits = np.where(unit == 0, 1.0, 10.0)
+    steps = scaled * digits
+    rounded = np.floor(steps + 0.5)
+    ties = np.flatnonzero(np.abs(steps - np.floor(steps) - 0.5) < 1e-6)
+    if ties.size:
+        rounded[ties] = [
+            round(float(f"{v:.{d}f}") * 10 ** d)
+            for v, d in zip(scaled[ties].tolist(), np.where(unit[ties] == 0, 0, 1).tolist())
+        ]
+
+    # 2) una etiqueta por par (unidad, valor redondeado) distinto, codificado en un entero
+    n_units = len(_TOOLTIP_SUFFIXES)
+    keys = rounded.astype(np.int64) * n_units + unit
+    distinct, inverse = np.unique(keys, return_inverse=True)
+    labels = np.array([
+        f"{value} s" if u == 0 else f"{value / 10:.1f} {_TOOLTIP_SUFFIXES[u]}"
+        for value, u in zip(*(a.tolist() for a in np.divmod(distinct, n_units)))
+    ], dtype=object)
+    return labels[inverse.ravel()]
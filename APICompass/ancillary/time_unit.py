@@ -1,4 +1,5 @@
 from enum import Enum
+from functools import total_ordering
 from math import floor
 from typing import Union
 class TimeUnit(Enum):
@@ -13,64 +14,15 @@ class TimeUnit(Enum):
     
     
     def to_seconds(self, value: int = 1) -> float:
-        if self == TimeUnit.MILLISECOND:
-            return value / 1000
-        elif self == TimeUnit.SECOND:
-            return value
-        elif self == TimeUnit.MINUTE:
-            return value * 60
-        elif self == TimeUnit.HOUR:
-            return value * 3600
-        elif self == TimeUnit.DAY:
-            return value * 86400
-        elif self == TimeUnit.WEEK:
-            return value * 604800
-        elif self == TimeUnit.MONTH:
-            return value * 2592000
-        elif self == TimeUnit.YEAR:
-            return value * 31104000
-        else:
-            raise ValueError("Invalid time unit")
+        mul, div = _SECONDS_FACTORS[self]
+        return value * mul if div == 1 else value / div
         
     def to_milliseconds(self, value: int = 1) -> float:
-        if self == TimeUnit.MILLISECOND:
-            return value
-        elif self == TimeUnit.SECOND:
-            return value * 1000
-        elif self == TimeUnit.MINUTE:
-            return value * 60000
-        elif self == TimeUnit.HOUR:
-            return value * 3600000
-        elif self == TimeUnit.DAY:
-            return value * 86400000
-        elif self == TimeUnit.WEEK:
-            return value * 604800000
-        elif self == TimeUnit.MONTH:
-            return value * 2592000000
-        elif self == TimeUnit.YEAR:
-            return value * 31104000000
-        else:
-            raise ValueError("Invalid time unit")
+        return value * _MS_PER_UNIT[self]
     
     def seconds_to_time_unit(self, seconds: float) -> float:
-        if self == TimeUnit.MILLISECOND:
-            return seconds * 1000
-        elif self == TimeUnit.SECOND:
-            return seconds
-        elif self == TimeUnit.MINUTE:
-            return seconds / 60
-        elif self == TimeUnit.HOUR:
-            return seconds / 3600
-        elif self == TimeUnit.DAY:
-            return seconds / 86400
-        elif self == TimeUnit.WEEK:
-            return seconds / 604800
-        elif self == TimeUnit.MONTH:
-            return seconds / 2592000
-        elif self == TimeUnit.YEAR:
-            return seconds / 31104000
-        else:
-            raise ValueError("Invalid time unit")
+        mul, div = _SECONDS_FACTORS[self]
+        return seconds * div if mul == 1 else seconds / mul
         
     def inferior_unit(self) -> "TimeUnit":
         """
@@ -108,17 +60,79 @@ class TimeUnit(Enum):
         return target_unit.seconds_to_time_unit(value_in_seconds)
 
 
+# Factores de conversión precalculados: segundos por unidad como (multiplicador, divisor)
+# y milisegundos por unidad. Se rellenan una vez, tras definir TimeUnit.
+_SECONDS_FACTORS = {
+    TimeUnit.MILLISECOND: (1, 1000),
+    TimeUnit.SECOND: (1, 1),
+    TimeUnit.MINUTE: (60, 1),
+    TimeUnit.HOUR: (3600, 1),
+    TimeUnit.DAY: (86400, 1),
+    TimeUnit.WEEK: (604800, 1),
+    TimeUnit.MONTH: (2592000, 1),
+    TimeUnit.YEAR: (31104000, 1),
+}
+_MS_PER_UNIT = {
+    TimeUnit.MILLISECOND: 1,
+    TimeUnit.SECOND: 1000,
+    TimeUnit.MINUTE: 60000,
+    TimeUnit.HOUR: 3600000,
+    TimeUnit.DAY: 86400000,
+    TimeUnit.WEEK: 604800000,
+    TimeUnit.MONTH: 2592000000,
+    TimeUnit.YEAR: 31104000000,
+}
+
+
+@total_ordering
 class TimeDuration:
+    """
+    Immutable duration expressed as a value in a TimeUnit.
+
+    Besides value and unit it keeps a canonical length in microseconds (an int
+    whenever it is a whole number of microseconds), used for equality, hashing
+    and ordering, so '60 s' == '1 min' and durations can be used as dict keys
+    and sort keys.
+    """
+
+    __slots__ = ("value", "unit", "_us")
+
     def __init__(self, value: int, unit: TimeUnit):
-        self.value = value
-        self.unit = unit
-        
+        us = value * _MS_PER_UNIT[unit] * 1000
+        if isinstance(us, float) and us.is_integer():
+            us = int(us)
+        set_attr = object.__setattr__
+        set_attr(self, "value", value)
+        set_attr(self, "unit", unit)
+        set_attr(self, "_us", us)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("TimeDuration is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("TimeDuration is immutable")
+
+    def __reduce__(self):
+        return (TimeDuration, (self.value, self.unit))
+
+    def __eq__(self, other):
+        if not isinstance(other, TimeDuration):
+            return NotImplemented
+        return self._us == other._us
+
+    def __lt__(self, other):
+        if not isinstance(other, TimeDuration):
+            return NotImplemented
+        return self._us < other._us
+
+    def __hash__(self):
+        return hash(self._us)
 
     def to_seconds(self) -> float:
         return self.unit.to_seconds(self.value)
     
     def to_milliseconds(self) -> float:
-        return self.unit.to_milliseconds(self.value)
+        return self.value * _MS_PER_UNIT[self.unit]
     
     def to_desired_time_unit(self, target_unit: TimeUnit) -> "TimeDuration":
         """
@@ -130,31 +144,11 @@ class TimeDuration:
         Returns:
             TimeDuration: Un nuevo objeto TimeDuration con el valor convertido.
         """
-    # Primero, convertimos la duración actual a segundos
-        seconds = self.to_seconds()
-
-        # Luego, convertimos los segundos a la unidad deseada
-        if target_unit == TimeUnit.MILLISECOND:
-            value_in_target_unit = seconds * 1000
-        elif target_unit == TimeUnit.SECOND:
-            value_in_target_unit = seconds
-        elif target_unit == TimeUnit.MINUTE:
-            value_in_target_unit = seconds / 60
-        elif target_unit == TimeUnit.HOUR:
-            value_in_target_unit = seconds / 3600
-        elif target_unit == TimeUnit.DAY:
-            value_in_target_unit = seconds / 86400
-        elif target_unit == TimeUnit.WEEK:
-            value_in_target_unit = seconds / 604800
-        elif target_unit == TimeUnit.MONTH:
-            value_in_target_unit = seconds / 2592000
-        elif target_unit == TimeUnit.YEAR:
-            value_in_target_unit = seconds / 31104000
-        else:
+        if not isinstance(target_unit, TimeUnit):
             raise ValueError("Invalid target time unit")
 
-        # Retornamos un nuevo objeto TimeDuration con la unidad deseada
-        return TimeDuration(value_in_target_unit, target_unit)
+        # Pasamos por segundos, como el resto de conversiones
+        return TimeDuration(target_unit.seconds_to_time_unit(self.to_seconds()), target_unit)
     
     def __add__(self, other: "TimeDuration") -> "TimeDuration":
         """
@@ -0,0 +1,222 @@
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from math import ceil, floor
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+from APICompass.basic.capacity_curve import CapacityCurve, PeriodicCapacityCurve
+from APICompass.basic.limit_stack import LimitStack
+from APICompass.instrumentation import instrumented
+
+
+class CapacityBackend(ABC):
+    """
+    Strategy used to build the accumulated capacity curve of a LimitStack.
+
+    Grid backends evaluate the capacity on every instant where it may change
+    (the rate ticks of every nested window) and keep only the instants where it
+    actually changes, so all of them return the same curve as the exact backend.
+    They differ in how the grid is evaluated.
+    """
+
+    name = None
+
+    @abstractmethod
+    def evaluate(self, stack: LimitStack, t_ms: np.ndarray) -> np.ndarray:
+        """
+        Evaluates the capacity of a stack on a grid of instants.
+
+        Args:
+            stack (LimitStack): The compiled limits.
+            t_ms (np.ndarray): Instants in milliseconds.
+
+        Returns:
+            np.ndarray: The capacity at each instant, as float64.
+        """
+
+    @instrumented
+    def accumulated(
+        self,
+        stack: LimitStack,
+        horizon_ms: float,
+        periodic_curve: Optional[PeriodicCapacityCurve] = None
+    ) -> CapacityCurve:
+        """
+        Accumulated capacity curve of a stack up to a horizon.
+
+        Args:
+            stack (LimitStack): The compiled limits.
+            horizon_ms (float): The horizon in milliseconds.
+            periodic_curve (Optional[PeriodicCapacityCurve]): The compressed curve of
+                the stack, if already built. Only used by the exact backend.
+
+        Returns:
+            CapacityCurve: The accumulated capacity curve, closed at the horizon.
+        """
+        times = candidate_times(stack, horizon_ms)
+        values = self.evaluate(stack, times)
+
+        # quedarse solo con los instantes donde la capacidad cambia
+        changes = np.empty(values.size, dtype=bool)
+        changes[0] = True
+        np.not_equal(values[1:], values[:-1], out=changes[1:])
+        changes[-1] = True
+        return CapacityCurve(times[changes], values[changes])
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+
+class ExactBackend(CapacityBackend):
+    """Tiles the exact breakpoints of one window of the outermost limit (default)."""
+
+    name = "exact"
+
+    def evaluate(self, stack: LimitStack, t_ms: np.ndarray) -> np.ndarray:
+        return stack.capacity_at_many(t_ms)
+
+    @instrumented
+    def accumulated(
+        self,
+        stack: LimitStack,
+        horizon_ms: float,
+        periodic_curve: Optional[PeriodicCapacityCurve] = None
+    ) -> CapacityCurve:
+        if periodic_curve is None:
+            periodic_curve = PeriodicCapacityCurve.from_stack(stack)
+        return periodic_curve.accumulated(horizon_ms)
+
+
+class SerialBackend(CapacityBackend):
+    """Evaluates the grid one instant at a time with LimitStack.capacity_at."""
+
+    name = "serial"
+
+    def evaluate(self, stack: LimitStack, t_ms: np.ndarray) -> np.ndarray:
+        return np.fromiter((stack.capacity_at(t) for t in t_ms.tolist()), dtype=np.float64, count=t_ms.size)
+
+
+class VectorizedBackend(CapacityBackend):
+    """Evaluates the grid in a single NumPy pass with LimitStack.capacity_at_many."""
+
+    name = "vectorized"
+
+    def evaluate(self, stack: LimitStack, t_ms: np.ndarray) -> np.ndarray:
+        return stack.capacity_at_many(t_ms)
+
+
+@dataclass(frozen=True)
+class _CapacityChunk:
+    # Picklable unit of work: the raw limits and a slice of the time axis.
+    units: Tuple[float, ...]
+    periods_ms: Tuple[float, ...]
+    t_ms: np.ndarray
+
+    def __call__(self) -> np.ndarray:
+        return LimitStack(self.units, self.periods_ms).capacity_at_many(self.t_ms)
+
+
+def _run_chunk(chunk: _CapacityChunk) -> np.ndarray:
+    return chunk()
+
+
+class ProcessBackend(CapacityBackend):
+    """
+    Splits the grid into chunks and evaluates them on a ProcessPoolExecutor.
+
+    Grids smaller than min_chunk_size per worker are evaluated in the calling
+    process, since starting the pool would cost more than the work itself.
+    """
+
+    name = "process"
+
+    def __init__(self, max_workers: Optional[int] = None, min_chunk_size: int = 1 << 18):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.min_chunk_size = min_chunk_size
+
+    def __repr__(self):
+        return f"ProcessBackend(max_workers={self.max_workers}, min_chunk_size={self.min_chunk_size})"
+
+    @instrumented
+    def evaluate(self, stack: LimitStack, t_ms: np.ndarray) -> np.ndarray:
+        n_chunks = min(self.max_workers, t_ms.size // self.min_chunk_size)
+        if n_chunks < 2:
+            return stack.capacity_at_many(t_ms)
+
+        chunks = [
+            _CapacityChunk(stack.units, stack.periods_ms, part)
+            for part in np.array_split(t_ms, n_chunks)
+        ]
+        with ProcessPoolExecutor(max_workers=n_chunks) as executor:
+            return np.concatenate(list(executor.map(_run_chunk, chunks)))
+
+
+def candidate_times(stack: LimitStack, horizon_ms: float) -> np.ndarray:
+    """
+    Every instant in [0, horizon_ms] at which the capacity of a stack may change:
+    the rate ticks inside each window of every limit, plus the horizon itself.
+
+    Args:
+        stack (LimitStack): The compiled limits.
+        horizon_ms (float): The horizon in milliseconds.
+
+    Returns:
+        np.ndarray: The sorted instants in milliseconds.
+    """
+    periods = stack.periods_ms
+    times = np.zeros(1)
+
+    # 1) de la rate a la cuota externa: repetir la rejilla del nivel inferior en cada ventana
+    for level in range(stack.depth):
+        top = level == stack.depth - 1
+        end = horizon_ms if top else periods[level + 1]
+        last_window = floor(end / periods[level]) if top else ceil(end / periods[level]) - 1
+        n = np.arange(max(last_window, 0) + 1, dtype=np.float64)
+        times = (n[:, None] * periods[level] + times[None, :]).ravel()
+        times = times[times <= end] if top else times[times < end]
+
+    if times[-1] < horizon_ms:
+        times = np.append(times, float(horizon_ms))
+    return times
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (ExactBackend(), SerialBackend(), VectorizedBackend(), ProcessBackend())
+}
+
+_default_backend: CapacityBackend = BACKENDS["exact"]
+
+
+def set_default_backend(backend: Union[str, CapacityBackend]) -> None:
+    """
+    Sets the backend used when a call does not pick one.
+
+    Args:
+        backend (Union[str, CapacityBackend]): A backend name ('exact', 'serial',
+            'vectorized' or 'process') or a backend instance.
+    """
+    global _default_backend
+    _default_backend = get_backend(backend)
+
+
+def get_backend(backend: Union[str, CapacityBackend, None] = None) -> CapacityBackend:
+    """
+    Resolves a backend name or instance, falling back to the default one.
+
+    Args:
+        backend (Union[str, CapacityBackend, None]): A backend name, a backend instance or None.
+
+    Returns:
+        CapacityBackend: The backend to use.
+    """
+    if backend is None:
+        return _default_backend
+    if isinstance(backend, CapacityBackend):
+        return backend
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}'. Valid backends: {', '.join(BACKENDS)}")
+    return BACKENDS[backend]
@@ -0,0 +1,60 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from APICompass.basic.capacity_curve import CapacityCurve
+
+
+@dataclass(frozen=True)
+class BacklogResult:
+    """
+    Backlog of a demand served by a plan: requests the demand has issued that the
+    plan could not have served yet, max(0, demand(t) - plan(t)).
+    """
+    max_backlog: float
+    max_backlog_time_ms: float
+    curve: CapacityCurve
+
+
+def compute_backlog(
+    plan_curve: CapacityCurve,
+    demand_curve: CapacityCurve,
+    horizon_ms: Optional[float] = None
+) -> BacklogResult:
+    """
+    Computes the backlog curve of a demand against a plan in a single pass.
+
+    Both curves are step functions, so their difference only changes at the
+    breakpoints of one of them. The breakpoints are merged once and both curves
+    are evaluated on the merged grid as aligned arrays, instead of scanning the
+    points of each curve for every sampled instant.
+
+    Args:
+        plan_curve (CapacityCurve): Accumulated capacity of the plan.
+        demand_curve (CapacityCurve): Accumulated capacity of the demand.
+        horizon_ms (Optional[float]): Last instant to consider. Defaults to the
+            shortest of both curves.
+
+    Returns:
+        BacklogResult: The maximum backlog, the first instant it happens and the
+            full backlog curve.
+    """
+    if horizon_ms is None:
+        horizon_ms = min(plan_curve.horizon_ms, demand_curve.horizon_ms)
+
+    # 1) rejilla común: puntos de ruptura de ambas curvas hasta el horizonte
+    times = np.union1d(plan_curve.breakpoints, demand_curve.breakpoints)
+    times = times[:int(np.searchsorted(times, horizon_ms, side="right"))]
+    if times.size == 0 or times[0] > 0:
+        times = np.concatenate(([0.0], times))
+
+    # 2) diferencia de arrays alineados
+    backlog = np.maximum(demand_curve.at_many(times) - plan_curve.at_many(times), 0.0)
+
+    idx = int(np.argmax(backlog))
+    return BacklogResult(
+        max_backlog=float(backlog[idx]),
+        max_backlog_time_ms=float(times[idx]) if backlog[idx] > 0 else 0.0,
+        curve=CapacityCurve(times, backlog)
+    )
@@ -1,36 +1,69 @@
-from concurrent.futures import ThreadPoolExecutor
-from typing import List, Union, Optional, Tuple
+from functools import cached_property
+from typing import TYPE_CHECKING, List, Union, Optional, Tuple
 
 import numpy as np
-import plotly.graph_objects as go
-from matplotlib.colors import to_rgba
 
 from APICompass.ancillary.time_unit import TimeDuration, TimeUnit
 from APICompass.utils import parse_time_string_to_duration, format_time_with_unit, select_best_time_unit
-from APICompass.ancillary.CapacityPlotHelper import CapacityPlotHelper
+from APICompass.basic.limit_stack import LimitStack
+from APICompass.basic.capacity_curve import DISPLAY_MAX_POINTS, CapacityCurve, PeriodicCapacityCurve
+from APICompass.basic.backends import CapacityBackend, get_backend
+from APICompass.basic.validation import QuotaValidator
+from APICompass.instrumentation import instrumented
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+# Horizontes distintos cuyos puntos de inflexión guarda cada BoundedRate
+INFLECTION_CACHE_SIZE = 16
+
 
 class Rate:
+    """
+    Immutable value object: equal rates hash equally, and derived values
+    (max_fa, unitary_rate, period_ms) are computed once on first use.
+    """
     
     def __init__(self, consumption_unit: int, consumption_period: Union[str, TimeDuration], fa:int = None):
     
         if isinstance(consumption_period, str):
             consumption_period = parse_time_string_to_duration(consumption_period)
-        self.consumption_unit = consumption_unit
-        self.consumption_period = consumption_period
-        self.fa = self.max_fa #FIX
 
         #FIX
         if fa:
-            if fa <= 0 or fa > self.max_fa:
-                raise ValueError(f"fa must be greater than 0 and less than or equal to {self.max_fa}")
-            new_rate = self.create_equivalent_rate(fa)
-            self.consumption_unit = new_rate.consumption_unit
-            self.consumption_period = new_rate.consumption_period
-            self.fa = new_rate.max_fa
+            base = Rate(consumption_unit, consumption_period)
+            if fa <= 0 or fa > base.max_fa:
+                raise ValueError(f"fa must be greater than 0 and less than or equal to {base.max_fa}")
+            new_rate = base.create_equivalent_rate(fa)
+            consumption_unit = new_rate.consumption_unit
+            consumption_period = new_rate.consumption_period
+
+        set_attr = object.__setattr__
+        set_attr(self, "consumption_unit", consumption_unit)
+        set_attr(self, "consumption_period", consumption_period)
+        set_attr(self, "fa", self.max_fa) #FIX
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Rate is immutable")
+
+    def __reduce__(self):
+        return (Rate, (self.consumption_unit, self.consumption_period))
+
+    def __eq__(self, other):
+        if type(other) is not Rate:
+            return NotImplemented
+        return (self.consumption_unit, self.consumption_period) == (other.consumption_unit, other.consumption_period)
+
+    def __hash__(self):
+        return hash((Rate, self.consumption_unit, self.consumption_period))
 
     def __repr__(self):
         return f"Rate({self.consumption_unit}, {self.consumption_period})"
 
+    @cached_property
+    def period_ms(self) -> float:
+        return self.consumption_period.to_milliseconds()
+
     @property
     def is_unitary(self):
         return self.consumption_unit == 1
@@ -56,47 +89,33 @@ class Rate:
             Rate: The unitary Rate.
         """
 
-        period = self.consumption_period.to_milliseconds() / self.consumption_unit
+        period = self.period_ms / self.consumption_unit
 
         period = period * fa
 
         return Rate(fa, TimeDuration(period, TimeUnit.MILLISECOND))
 
+    @cached_property
+    def unitary_rate(self) -> "Rate":
+        return self.create_equivalent_rate()
+
     #FIX
-    @property
+    @cached_property
     def max_fa(self):
 
         if self.is_unitary:
             return 1
 
-        max_period_ms = self.consumption_period.to_milliseconds()
-
-        unitary_rate = self.create_equivalent_rate()
-
-        unitary_rate_period_ms = unitary_rate.consumption_period.to_milliseconds()
-
-        max_fa = int(max_period_ms / unitary_rate_period_ms)
-
-        return max_fa
+        return int(self.period_ms / self.unitary_rate.period_ms)
 
     #FIX
     @property
     def max_fa_and_uniform_fa(self):
 
-        if self.is_unitary:
-            return 1, 1
-
-        max_period_ms = self.consumption_period.to_milliseconds()
-
-        unitary_rate = self.create_equivalent_rate()
-
-        unitary_rate_period_ms = unitary_rate.consumption_period.to_milliseconds()
-
-        max_fa = int(max_period_ms / unitary_rate_period_ms)
-
-        return max_fa, 1
+        return self.max_fa, 1
 
     
+    @instrumented
     def capacity_at(self, t: Union[str, TimeDuration], fa: int = None):
         """
         Calculates the capacity at a given time.
@@ -129,13 +148,40 @@ class Rate:
         else:
             t_milliseconds = t.value
     
-        value, period = self.consumption_unit, self.consumption_period.to_milliseconds()
+        value, period = self.consumption_unit, self.period_ms
         
         c = value * np.floor((t_milliseconds / period)+1)
-        
+
         return c
 
-    def show_capacity(self, time_interval: Union[str, TimeDuration], fa: int = None, color=None, return_fig=False, debug=False):
+    @instrumented
+    def capacity_at_many(self, t_ms: np.ndarray, fa: int = None) -> np.ndarray:
+        """
+        Calculates the capacity at many instants in a single vectorized pass.
+
+        Args:
+            t_ms (np.ndarray): Instants in milliseconds (int64 or float64).
+            fa (int, optional): Factor de aceleración (acceleration factor). Defaults to the maximum factor if None.
+
+        Returns:
+            np.ndarray: The capacity at each instant, as float64.
+        """
+        if fa is None:
+            fa = self.max_fa
+
+        if fa <= 0 or fa > self.max_fa:
+            raise ValueError(f"fa must be greater than 0 and less than or equal to {self.max_fa}")
+
+        if fa < self.max_fa:
+            return self.create_equivalent_rate(fa).capacity_at_many(t_ms)
+
+        t_ms = np.asarray(t_ms, dtype=np.float64)
+        value, period = self.consumption_unit, self.period_ms
+
+        return value * np.floor((t_ms / period) + 1)
+
+    def show_capacity(self, time_interval: Union[str, TimeDuration], fa: int = None, color=None, return_fig=False, debug=False,
+                      max_points: Optional[int] = DISPLAY_MAX_POINTS):
         """
         Plots the capacity curve for this Rate.
 
@@ -144,6 +190,8 @@ class Rate:
             fa (int, optional): Factor de aceleración (acceleration factor). Defaults to the maximum factor if None.
             color (str, optional): Color for the curve. Defaults to None.
             return_fig (bool, optional): Whether to return the figure. Defaults to False.
+            max_points (Optional[int], optional): Maximum points of the plotted trace; None plots
+                every step. The curve returned with debug=True is never decimated.
 
         Returns:
             Optional[go.Figure]: The plotly figure if return_fig is True.
@@ -159,44 +207,41 @@ class Rate:
         #FIX
         if fa < self.max_fa:
             new_rate = self.create_equivalent_rate(fa)
-            return new_rate.show_capacity(time_interval, color=color, return_fig=return_fig, debug=debug)
+            return new_rate.show_capacity(time_interval, color=color, return_fig=return_fig, debug=debug,
+                                          max_points=max_points)
 
         if isinstance(time_interval, str):
             time_interval = parse_time_string_to_duration(time_interval)
 
         t_milliseconds = int(time_interval.to_milliseconds())
         step = int(self.consumption_period.to_milliseconds())
-        defined_t_values_ms = list(range(0, t_milliseconds + 1, step))
+        defined_t_values_ms = np.arange(0, t_milliseconds + 1, step, dtype=np.float64)
 
         # Ensure the last point is included
         if defined_t_values_ms[-1] != t_milliseconds:
-            defined_t_values_ms.append(t_milliseconds)
+            defined_t_values_ms = np.append(defined_t_values_ms, t_milliseconds)
 
-        defined_capacity_values = [
-            self.capacity_at(TimeDuration(t, TimeUnit.MILLISECOND)) for t in defined_t_values_ms
-        ]
+        curve = CapacityCurve(defined_t_values_ms, self.capacity_at_many(defined_t_values_ms))
 
         if debug:
-            return list(zip(defined_t_values_ms, defined_capacity_values))
+            return curve
 
-        original_times_in_specified_unit = [
-            t / time_interval.unit.to_milliseconds() for t in defined_t_values_ms
-        ]
+        curve = curve.decimate(max_points)
+        defined_capacity_values = curve.values
+        original_times_in_specified_unit = curve.breakpoints / time_interval.unit.to_milliseconds()
         x_label = f"Time ({time_interval.unit.value})"
 
-        fig = go.Figure()
-
-        rgba_color = f"rgba({','.join(map(str, [int(c * 255) for c in to_rgba(color or 'green')[:3]]))},0.3)"
-
-        fig.add_trace(go.Scatter(
-            x=original_times_in_specified_unit,
-            y=defined_capacity_values,
+        # plotly/matplotlib solo se cargan al dibujar
+        from APICompass.ancillary.figure_builder import build_figure, fill_color, trace
+        fig = build_figure([trace(
+            original_times_in_specified_unit,
+            defined_capacity_values,
             mode='lines',
             line=dict(color=color or 'green', shape='hv', width=1.3),
             fill='tonexty',
-            fillcolor=rgba_color,
+            fillcolor=fill_color(color or 'green', 0.3),
             name='Rate Capacity'
-        ))
+        )])
 
         fig.update_layout(
             title=f'Capacity Curve - Rate - {time_interval.value} {time_interval.unit.value}',
@@ -245,6 +290,7 @@ class Rate:
         # Return the difference in capacity
         return capacity_at_end - capacity_at_start
 
+    @instrumented
     def min_time(self, capacity_goal: int, return_unit: Optional[TimeUnit] = None, display=True) -> Union[str, TimeDuration]:
         """
         Calculates the minimum time to reach a capacity goal for the Rate.
@@ -276,6 +322,25 @@ class Rate:
         
         return format_time_with_unit(duration_desired) if display else duration_desired
 
+    def min_time_many(self, capacity_goals: np.ndarray) -> np.ndarray:
+        """
+        Calculates the minimum time to reach many capacity goals for the Rate at once.
+
+        Args:
+            capacity_goals (np.ndarray): The capacity goals to reach.
+
+        Returns:
+            np.ndarray: The minimum time for each goal in milliseconds, as int64.
+        """
+        goals = np.asarray(capacity_goals)
+        if goals.dtype.kind not in "iu":
+            raise TypeError("capacity_goals must be integer numbers of requests")
+        if np.any(goals < 0):
+            raise ValueError("The 'capacity goal' should be greater or equal to 0.")
+
+        T = np.where(goals > 0, np.floor((goals - 1) * self.period_ms / self.consumption_unit), 0)
+        return T.astype(np.int64)
+
     def convert_to_largest(self, other: 'Rate') -> 'Rate':
         """
         Converts this rate to match the largest time unit between this rate and another rate.
@@ -351,13 +416,35 @@ class Rate:
 
 
 class Quota:
+    """
+    Immutable value object: equal quotas hash equally and period_ms is computed once.
+    """
     
     def __init__(self, consumption_unit: int, consumption_period: Union[str, TimeDuration]):
     
         if isinstance(consumption_period, str):
             consumption_period = parse_time_string_to_duration(consumption_period)
-        self.consumption_unit = consumption_unit
-        self.consumption_period = consumption_period
+        set_attr = object.__setattr__
+        set_attr(self, "consumption_unit", consumption_unit)
+        set_attr(self, "consumption_period", consumption_period)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Quota is immutable")
+
+    def __reduce__(self):
+        return (Quota, (self.consumption_unit, self.consumption_period))
+
+    def __eq__(self, other):
+        if type(other) is not Quota:
+            return NotImplemented
+        return (self.consumption_unit, self.consumption_period) == (other.consumption_unit, other.consumption_period)
+
+    def __hash__(self):
+        return hash((Quota, self.consumption_unit, self.consumption_period))
+
+    @cached_property
+    def period_ms(self) -> float:
+        return self.consumption_period.to_milliseconds()
         
     def __str__(self):
         return f"Quota({self.consumption_unit}, {self.consumption_period})"
@@ -365,6 +452,7 @@ class Quota:
     def __repr__(self):
         return f"Quota({self.consumption_unit}, {self.consumption_period})"
         
+    @instrumented
     def capacity_at(self, t: Union[str, TimeDuration]):
         if isinstance(t, str):
             t = parse_time_string_to_duration(t)
@@ -374,50 +462,55 @@ class Quota:
         else:
             t_milliseconds = t.value
     
-        value, period = self.consumption_unit, self.consumption_period.to_milliseconds()
+        value, period = self.consumption_unit, self.period_ms
         
         c = value * np.floor((t_milliseconds / period)+1)
-        
+
         return c
 
+    @instrumented
+    def capacity_at_many(self, t_ms: np.ndarray) -> np.ndarray:
+        """
+        Calculates the capacity at many instants in a single vectorized pass.
+
+        Args:
+            t_ms (np.ndarray): Instants in milliseconds (int64 or float64).
+
+        Returns:
+            np.ndarray: The capacity at each instant, as float64.
+        """
+        t_ms = np.asarray(t_ms, dtype=np.float64)
+        value, period = self.consumption_unit, self.period_ms
+
+        return value * np.floor((t_ms / period) + 1)
+
     def show_capacity(self, time_interval: Union[str, TimeDuration], color=None, return_fig=False, debug=False):
         if isinstance(time_interval, str):
             time_interval = parse_time_string_to_duration(time_interval)
 
         t_milliseconds = int(time_interval.to_milliseconds())
         step = int(self.consumption_period.to_milliseconds())
-        defined_t_values_ms = list(range(0, t_milliseconds + 1, step))
-
-        # Ensure at least two points if only one exists and t > 0
-        if len(defined_t_values_ms) == 1 and t_milliseconds > 0:
-            defined_t_values_ms.append(t_milliseconds)
+        defined_t_values_ms = np.arange(0, t_milliseconds + 1, step, dtype=np.float64)
 
-        # Ensure the last point is included
+        # Ensure the last point is included (and at least two points if t > 0)
         if defined_t_values_ms[-1] != t_milliseconds:
-            defined_t_values_ms.append(t_milliseconds)
-
-        defined_capacity_values = [
-            self.capacity_at(TimeDuration(t, TimeUnit.MILLISECOND)) for t in defined_t_values_ms
-        ]
+            defined_t_values_ms = np.append(defined_t_values_ms, t_milliseconds)
 
-        original_times_in_specified_unit = [
-            t / time_interval.unit.to_milliseconds() for t in defined_t_values_ms
-        ]
+        defined_capacity_values = self.capacity_at_many(defined_t_values_ms)
+        original_times_in_specified_unit = defined_t_values_ms / time_interval.unit.to_milliseconds()
         x_label = f"Time ({time_interval.unit.value})"
 
-        fig = go.Figure()
-
-        rgba_color = f"rgba({','.join(map(str, [int(c * 255) for c in to_rgba(color or 'blue')[:3]]))},0.3)"
-
-        fig.add_trace(go.Scatter(
-            x=original_times_in_specified_unit,
-            y=defined_capacity_values,
+        # plotly/matplotlib solo se cargan al dibujar
+        from APICompass.ancillary.figure_builder import build_figure, fill_color, trace
+        fig = build_figure([trace(
+            original_times_in_specified_unit,
+            defined_capacity_values,
             mode='lines',
             line=dict(color=color or 'blue', shape='hv', width=1.3),
             fill='tonexty',
-            fillcolor=rgba_color,
+            fillcolor=fill_color(color or 'blue', 0.3),
             name='Quota Capacity'
-        ))
+        )])
 
         fig.update_layout(
             title=f'Capacity Curve - Quota - {time_interval.value} {time_interval.unit.value}',
@@ -466,6 +559,7 @@ class Quota:
     # Return the difference in capacity
         return capacity_at_end - capacity_at_start
 
+    @instrumented
     def min_time(self, capacity_goal: int, return_unit: Optional[TimeUnit] = None, display=True) -> Union[str, TimeDuration]:
         """
         Calculates the minimum time to reach a capacity goal for the Quota.
@@ -488,8 +582,25 @@ class Quota:
             return_unit = self.consumption_period.unit
         duration_desired = result_duration.to_desired_time_unit(return_unit)
         return format_time_with_unit(duration_desired) if display else duration_desired
-        
-        return duration_desired
+
+    def min_time_many(self, capacity_goals: np.ndarray) -> np.ndarray:
+        """
+        Calculates the minimum time to reach many capacity goals for the Quota at once.
+
+        Args:
+            capacity_goals (np.ndarray): The capacity goals to reach.
+
+        Returns:
+            np.ndarray: The minimum time for each goal in milliseconds, as int64.
+        """
+        goals = np.asarray(capacity_goals)
+        if goals.dtype.kind not in "iu":
+            raise TypeError("capacity_goals must be integer numbers of requests")
+        if np.any(goals < 0):
+            raise ValueError("The 'capacity goal' should be greater or equal to 0.")
+
+        T = np.where(goals > 0, np.floor((goals - 1) * self.period_ms / self.consumption_unit), 0)
+        return T.astype(np.int64)
 
     def convert_to_largest(self, other: 'Quota') -> 'Quota':
         """
@@ -518,43 +629,68 @@ class Quota:
 
 
 class BoundedRate:
+    """
+    Immutable value object: a rate, its reachable quotas (as tuples) and an
+    optional max_active_time. Quotas that cannot be reached are left out and
+    listed, with the reason, in validation_report. Equal bounded rates hash
+    equally, so plans can be used as dict and cache keys, and compiled forms
+    (limit_stack, periodic_curve, inflection points) are built once and reused.
+    """
         
     def __init__(self, rate: Rate, quota: Union[Quota, List[Quota], None] = None, max_active_time: Optional[TimeDuration] = None):
-        self.rate = rate
-        self.quota = []
-        self.limits = [rate]
-
+        # Cuotas válidas en orden; las omitidas quedan en validation_report
+        validator = QuotaValidator(rate)
         if quota:
-            quotas = [quota] if not isinstance(quota, list) else quota
-            valid_quotas = []
-
+            quotas = [quota] if not isinstance(quota, (list, tuple)) else quota
             for q in quotas:
-                # Validación rápida: que sea mayor que la rate y no supere el máximo posible
-                if q.consumption_unit <= rate.consumption_unit:
-                    continue
-                rate_capacity = rate.consumption_unit * (
-                    q.consumption_period.to_milliseconds() / rate.consumption_period.to_milliseconds()
-                )
-                if q.consumption_unit > rate_capacity:
-                    continue
-
-                # Simular capacidad hasta el momento de esa cuota
-                temp_limits = [rate] + valid_quotas
-                temp_br = object.__new__(BoundedRate)
-                temp_br.rate = rate
-                temp_br.quota = valid_quotas.copy()
-                temp_br.limits = temp_limits
-                capacity = temp_br.capacity_at(q.consumption_period)
-
-                if capacity >= q.consumption_unit:
-                    valid_quotas.append(q)
-                    self.limits.append(q)
-                else:
-                    print(f"[WARNING] Quota omitted as unreachable: {q}")
-
-            self.quota = valid_quotas
-        self.max_active_time = max_active_time
-            
+                validator.add(q)
+        report = validator.report()
+
+        set_attr = object.__setattr__
+        set_attr(self, "rate", rate)
+        set_attr(self, "quota", report.accepted)
+        set_attr(self, "limits", (rate,) + report.accepted)
+        set_attr(self, "max_active_time", max_active_time)
+        set_attr(self, "validation_report", report)
+        set_attr(self, "_inflection_cache", {})
+
+    def __setattr__(self, name, value):
+        raise AttributeError("BoundedRate is immutable")
+
+    def __reduce__(self):
+        return (BoundedRate, (self.rate, self.quota, self.max_active_time))
+
+    def __eq__(self, other):
+        if not isinstance(other, BoundedRate):
+            return NotImplemented
+        return (self.limits, self.max_active_time) == (other.limits, other.max_active_time)
+
+    def __hash__(self):
+        return hash((self.limits, self.max_active_time))
+
+    def __repr__(self):
+        return f"BoundedRate({', '.join(map(repr, self.limits))})"
+
+    @cached_property
+    def limit_stack(self) -> LimitStack:
+        """
+        Compiled form of self.limits, built on first use.
+
+        Returns:
+            LimitStack: The units and millisecond periods of every limit.
+        """
+        return LimitStack.from_limits(self.limits)
+
+    @cached_property
+    def periodic_curve(self) -> PeriodicCapacityCurve:
+        """
+        Accumulated capacity curve stored as one window of the outermost limit, built on first use.
+
+        Returns:
+            PeriodicCapacityCurve: The compressed capacity curve.
+        """
+        return PeriodicCapacityCurve.from_stack(self.limit_stack)
+
     def _effective_time(self, time_interval: TimeDuration) -> TimeDuration:
         """
         Si tengo max_active_time, devuelvo el mínimo
@@ -568,15 +704,17 @@ class BoundedRate:
             return time_interval
         return self.max_active_time
 
-    def set_rate(self, new_rate: Rate):
+    def set_rate(self, new_rate: Rate) -> "BoundedRate":
         """
-        Sets a new rate for the BoundedRate object.
+        Returns a copy of this BoundedRate with a different rate.
 
         Args:
             new_rate (Rate): The new rate to be set.
+
+        Returns:
+            BoundedRate: A new BoundedRate with the new rate and the same quotas.
         """
-        self.rate = new_rate
-        self.limits[0] = new_rate
+        return BoundedRate(new_rate, self.quota, self.max_active_time)
         
     def reduce_rate(self, reduction_percentage: float):
         """
@@ -614,6 +752,7 @@ class BoundedRate:
         return BoundedRate(new_rate, self.quota)
         
 
+    @instrumented
     def capacity_at(self, time_simulation: TimeDuration):
         """
         Calculates the effective capacity at a given time without exposing limits_length.
@@ -631,31 +770,26 @@ class BoundedRate:
             t_milliseconds = time_simulation.to_milliseconds()
         else:
             t_milliseconds = time_simulation.value
-        def _calculate_capacity(t_milliseconds, limits_length):
-            if limits_length >= len(self.limits):
-                raise ValueError("Try with length = {}".format(len(self.limits) - 1))
 
-            value, period = self.limits[limits_length].consumption_unit, self.limits[limits_length].consumption_period.to_milliseconds()
+        return self.limit_stack.capacity_at(t_milliseconds)
+
+    @instrumented
+    def capacity_at_many(self, t_ms: np.ndarray) -> np.ndarray:
+        """
+        Calculates the effective capacity at many instants in a single vectorized pass.
 
-            if limits_length == 0:
-                c = value * np.floor((t_milliseconds / period) + 1)
-            else:
-                ni = np.floor(t_milliseconds / period)  # determines which interval number (ni) 't' belongs to
-                qvalue = value * ni  # capacity due to quota
-                aux = t_milliseconds - ni * period  # auxiliary variable
-                cprevious = _calculate_capacity(aux, limits_length - 1)
-                ramp = min(cprevious, value)  # capacity due to ramp
-                c = qvalue + ramp
+        Equivalent to calling capacity_at on every instant, evaluated from the
+        compiled limit stack.
 
-            return c
+        Args:
+            t_ms (np.ndarray): Instants in milliseconds (int64 or float64).
 
-        if time_simulation.unit != TimeUnit.MILLISECOND:
-            t_milliseconds = time_simulation.to_milliseconds()
-        else:
-            t_milliseconds = time_simulation.value
+        Returns:
+            np.ndarray: The effective capacity at each instant, as float64.
+        """
+        return self.limit_stack.capacity_at_many(t_ms)
 
-        return _calculate_capacity(t_milliseconds, len(self.limits) - 1)
-    
+    @instrumented
     def capacity_during(self, end_instant: Union[str, TimeDuration], start_instant: Union[str, TimeDuration] = "0ms") -> float:
         """
         Calculates the capacity during a specified time interval.
@@ -687,51 +821,39 @@ class BoundedRate:
         # Return the difference in capacity
         return capacity_at_end - capacity_at_start
 
-    def show_available_capacity_curve(self, time_interval: TimeDuration, debug: bool = False, color=None, return_fig=False) -> None:
+    @instrumented
+    def show_available_capacity_curve(self, time_interval: TimeDuration, debug: bool = False, color=None, return_fig=False,
+                                      backend: Union[str, CapacityBackend, None] = None,
+                                      max_points: Optional[int] = DISPLAY_MAX_POINTS) -> None:
     # 1) recortamos el intervalo según max_active_time
         if isinstance(time_interval, str):
             time_interval = parse_time_string_to_duration(time_interval)
 
         time_interval = self._effective_time(time_interval)
 
+        # 2) solo los puntos de ruptura reales de la curva escalonada (backend 'exact' por defecto)
         t_milliseconds = int(time_interval.to_milliseconds())
-        step = int(self.limits[0].consumption_period.to_milliseconds())
-        defined_t_values_ms = list(range(0, t_milliseconds + 1, step))
-
-        if len(defined_t_values_ms) == 1 and t_milliseconds > 0:
-            defined_t_values_ms.append(t_milliseconds)
-        if defined_t_values_ms[-1] != t_milliseconds:
-            defined_t_values_ms.append(t_milliseconds)
-
-        with ThreadPoolExecutor() as executor:
-            defined_capacity_values = list(
-                executor.map(
-                    lambda t: self.capacity_at(
-                        TimeDuration(t, TimeUnit.MILLISECOND)
-                    ),
-                    defined_t_values_ms
-                )
-            )
+        curve = get_backend(backend).accumulated(self.limit_stack, t_milliseconds, self.periodic_curve)
 
         if debug:
-            return list(zip(defined_t_values_ms, defined_capacity_values))
-
-        original_times = [
-            t / time_interval.unit.to_milliseconds() for t in defined_t_values_ms
-        ]
-
-        fig = go.Figure()
-        rgba_color = f"rgba({','.join(map(str, [int(c * 255) for c in to_rgba(color or 'green')[:3]]))},0.3)"
-
-        fig.add_trace(go.Scatter(
-            x=original_times,
-            y=defined_capacity_values,
+            return curve
+
+        # la traza se diezma; la curva exacta queda para debug=True
+        curve = curve.decimate(max_points)
+        original_times = curve.breakpoints / time_interval.unit.to_milliseconds()
+        defined_capacity_values = curve.values
+
+        # plotly/matplotlib solo se cargan al dibujar
+        from APICompass.ancillary.figure_builder import build_figure, fill_color, trace
+        fig = build_figure([trace(
+            original_times,
+            defined_capacity_values,
             mode='lines',
             line=dict(color=color or 'green', shape='hv', width=1.3),
             fill='tonexty',
-            fillcolor=rgba_color,
+            fillcolor=fill_color(color or 'green', 0.3),
             name='Accumulated Capacity'
-        ))
+        )])
 
         fig.update_layout(
             title=f'Capacity Curve - Effective Capacity - {time_interval.value} {time_interval.unit.value}',
@@ -749,46 +871,38 @@ class BoundedRate:
 
 
 
-    def show_instantaneous_capacity_curve(self, time_interval: TimeDuration, debug: bool = False, color=None, return_fig=False) -> None:
+    @instrumented
+    def show_instantaneous_capacity_curve(self, time_interval: TimeDuration, debug: bool = False, color=None, return_fig=False,
+                                          max_points: Optional[int] = DISPLAY_MAX_POINTS) -> None:
     # 1) recortamos el intervalo
         if isinstance(time_interval, str):
             time_interval = parse_time_string_to_duration(time_interval)
             
         time_interval = self._effective_time(time_interval)
 
+        # 2) la primera ventana de la cuota externa, repetida hasta el horizonte
         t_milliseconds = int(time_interval.to_milliseconds())
-        step = int(self.limits[0].consumption_period.to_milliseconds())
-        quota_frequency_ms = self.limits[-1].consumption_period.to_milliseconds()
-
-        defined_t_values_ms = list(range(0, t_milliseconds + 1, step))
-        if defined_t_values_ms[-1] != t_milliseconds:
-            defined_t_values_ms.append(t_milliseconds)
-
-        defined_capacity_values = []
-        for t in defined_t_values_ms:
-            period_time = t % quota_frequency_ms
-            capacity = self.capacity_at(TimeDuration(period_time, TimeUnit.MILLISECOND))
-            defined_capacity_values.append(capacity)
+        curve = self.periodic_curve.instantaneous(t_milliseconds)
 
         if debug:
-            return list(zip(defined_t_values_ms, defined_capacity_values))
-
-        original_times = [
-            t / time_interval.unit.to_milliseconds() for t in defined_t_values_ms
-        ]
-
-        fig = go.Figure()
-        rgba_color = f"rgba({','.join(map(str, [int(c * 255) for c in to_rgba(color or 'blue')[:3]]))},0.3)"
-
-        fig.add_trace(go.Scatter(
-            x=original_times,
-            y=defined_capacity_values,
+            return curve
+
+        # la traza se diezma; la curva exacta queda para debug=True
+        curve = curve.decimate(max_points)
+        original_times = curve.breakpoints / time_interval.unit.to_milliseconds()
+        defined_capacity_values = curve.values
+
+        # plotly/matplotlib solo se cargan al dibujar
+        from APICompass.ancillary.figure_builder import build_figure, fill_color, trace
+        fig = build_figure([trace(
+            original_times,
+            defined_capacity_values,
             mode='lines',
             line=dict(color=color or 'blue', shape='hv', width=1.3),
             fill='tonexty',
-            fillcolor=rgba_color,
+            fillcolor=fill_color(color or 'blue', 0.3),
             name='Instantaneous Capacity'
-        ))
+        )])
 
         fig.update_layout(
             title=f'Instantaneous Capacity Curve - Effective Capacity - {time_interval.value} {time_interval.unit.value}',
@@ -805,40 +919,33 @@ class BoundedRate:
         fig.show()
 
 
-    def show_capacity(self, time_interval: Union[str, TimeDuration], debug: bool = False, color=None, return_fig=False):
+    @instrumented
+    def show_capacity(self, time_interval: Union[str, TimeDuration], debug: bool = False, color=None, return_fig=False,
+                      backend: Union[str, CapacityBackend, None] = None, max_points: Optional[int] = DISPLAY_MAX_POINTS):
         if isinstance(time_interval, str):
             time_interval = parse_time_string_to_duration(time_interval)
 
-        t_milliseconds = int(time_interval.to_milliseconds())
-        step = int(self.limits[0].consumption_period.to_milliseconds())
-        defined_t_values_ms = list(range(0, t_milliseconds + 1, step))
-
-        # Ensure at least two points if only one exists and t > 0
-        if len(defined_t_values_ms) == 1 and t_milliseconds > 0:
-            defined_t_values_ms.append(t_milliseconds)
+        if debug:
+            return self.show_available_capacity_curve(time_interval, debug=True, backend=backend)
 
-        max_quota_duration_ms = self.limits[-1].consumption_period.to_milliseconds()
+        t_milliseconds = int(time_interval.to_milliseconds())
+        max_quota_duration_ms = self.limit_stack.top_period_ms
 
         if t_milliseconds > max_quota_duration_ms and len(self.limits) > 1:
             print("Exceeded quota duration. Switching between accumulated and instantaneous curves is possible.")
 
-            fig_accumulated = self.show_available_capacity_curve(time_interval, debug, color, return_fig=True)
-            fig_instantaneous = self.show_instantaneous_capacity_curve(time_interval, debug, color, return_fig=True)
-
-            fig = go.Figure()
-
-            for trace in fig_accumulated.data:
-                fig.add_trace(trace)
-            for trace in fig_instantaneous.data:
-                fig.add_trace(trace)
+            fig_accumulated = self.show_available_capacity_curve(time_interval, color=color, return_fig=True, backend=backend,
+                                                                 max_points=max_points)
+            fig_instantaneous = self.show_instantaneous_capacity_curve(time_interval, color=color, return_fig=True,
+                                                                       max_points=max_points)
 
+            # las trazas ya construidas se añaden tal cual, con sus arrays, sin serializarlas
+            from APICompass.ancillary.figure_builder import build_figure
             n_acc = len(fig_accumulated.data)
             n_inst = len(fig_instantaneous.data)
-
-            for i in range(n_acc):
-                fig.data[i].visible = True
-            for i in range(n_inst):
-                fig.data[n_acc + i].visible = False
+            fig = build_figure([])
+            fig.add_traces([tr.update(visible=True) for tr in fig_accumulated.data])
+            fig.add_traces([tr.update(visible=False) for tr in fig_instantaneous.data])
 
             accum_visible = [True] * n_acc + [False] * n_inst
             inst_visible = [False] * n_acc + [True] * n_inst
@@ -881,9 +988,10 @@ class BoundedRate:
             # Aquí reemplazamos el antiguo return de show_available_capacity_curve
             fig = self.show_available_capacity_curve(
                 time_interval,
-                debug=debug,
                 color=color,
-                return_fig=True
+                return_fig=True,
+                backend=backend,
+                max_points=max_points
             )
             # Nos aseguramos de que la leyenda aparezca
             fig.update_layout(showlegend=True)
@@ -892,6 +1000,7 @@ class BoundedRate:
             fig.show()
 
 
+    @instrumented
     def min_time(self, capacity_goal: int, return_unit: Optional[TimeUnit] = None, display=True) -> Union[str, TimeDuration]:
         """
         Calculates the minimum time to reach a capacity goal for the BoundedRate.
@@ -910,34 +1019,41 @@ class BoundedRate:
         if capacity_goal < 0:
             raise ValueError("The 'capacity goal' should be greater or equal to 0.")
 
-        # 1) Acumular tiempo para cada cuota (de mayor a menor), consumiendo batches completos
-        T = 0
-        for limit in reversed(self.limits[1:]):
-            if capacity_goal <= 0:
-                break
-            nu = np.floor(capacity_goal / limit.consumption_unit)
-            delta = (capacity_goal == nu * limit.consumption_unit)
-            n_i = int(nu - 1 if delta else nu)
-            T += n_i * limit.consumption_period.to_milliseconds()
-            capacity_goal -= n_i * limit.consumption_unit
-
-        # 2) Batch inicial del rate (por múltiplos enteros de consumption_unit)
-        rate = self.limits[0]
-        c_r = rate.consumption_unit
-        if capacity_goal > c_r:
-            from math import ceil
-            batches = ceil(capacity_goal / c_r)
-            p_r_ms = rate.consumption_period.to_milliseconds()
-            T += (batches - 1) * p_r_ms
-
-        # 3) Construir la duración en milisegundos
-        result_duration = TimeDuration(int(T), TimeUnit.MILLISECOND)
+        # 1) Cuotas completas (de mayor a menor) y batch inicial de la rate
+        T = self.limit_stack.min_time_ms(capacity_goal)
+
+        # 2) Construir la duración en la unidad deseada
+        return self._format_min_time(T, return_unit, display)
+
+    @instrumented
+    def min_time_many(self, capacity_goals: np.ndarray) -> np.ndarray:
+        """
+        Calculates the minimum time to reach many capacity goals for the BoundedRate at once.
+
+        Equivalent to calling min_time on every goal, without building a TimeDuration
+        or a formatted string per goal. Use format_durations_ms to format the result.
+
+        Args:
+            capacity_goals (np.ndarray): The capacity goals to reach.
+
+        Returns:
+            np.ndarray: The minimum time for each goal in milliseconds, as int64.
+        """
+        goals = np.asarray(capacity_goals)
+        if goals.dtype.kind not in "iu":
+            raise TypeError("capacity_goals must be integer numbers of requests")
+        if np.any(goals < 0):
+            raise ValueError("The 'capacity goal' should be greater or equal to 0.")
+
+        return self.limit_stack.min_time_ms_many(goals)
+
+    def _format_min_time(self, T: int, return_unit: Optional[TimeUnit], display: bool) -> Union[str, TimeDuration]:
         if T == 0:
             return "0s"
 
-        # 4) Convertir a la unidad deseada
+        result_duration = TimeDuration(T, TimeUnit.MILLISECOND)
         if return_unit is None:
-            return_unit = rate.consumption_period.unit
+            return_unit = self.limits[0].consumption_period.unit
         duration_desired = result_duration.to_desired_time_unit(return_unit)
         return format_time_with_unit(duration_desired) if display else duration_desired
 
@@ -946,7 +1062,7 @@ class BoundedRate:
     def calcular_puntos_inflexion(self):
         puntos = []
         limits_no_rate = self.limits[1:]
-        if not isinstance(limits_no_rate, list):
+        if not isinstance(limits_no_rate, (list, tuple)):
             limits_no_rate = [limits_no_rate]
 
         exhaustion_thresholds = self.quota_exhaustion_threshold(display=False)
@@ -970,105 +1086,93 @@ class BoundedRate:
 
         return puntos
 
-    def calculate_inflection_points(self, time_interval: Union[str, TimeDuration]) -> List[Tuple[float, float]]:
+    @instrumented
+    def calculate_inflection_points(self, time_interval: Union[str, TimeDuration]) -> CapacityCurve:
         """
-        Returns a list of (t_ms, capacity) inflection points for each quota window,
+        Returns the (t_ms, capacity) inflection points for each quota window,
         up to the given time_interval, pruning redundant plateau points.
         Always guarantees at least [(0, cap0), (sim_ms, cap_sim)].
+        The points are meant to be joined with straight lines.
         """
         # 1) normalize input
         if isinstance(time_interval, str):
             time_interval = parse_time_string_to_duration(time_interval)
         sim_ms = int(time_interval.to_milliseconds())
 
+        # the curve is immutable, so it is shared between calls with the same horizon
+        cached = self._inflection_cache.get(sim_ms)
+        if cached is None:
+            cached = self._inflection_points(sim_ms)
+            if len(self._inflection_cache) >= INFLECTION_CACHE_SIZE:
+                self._inflection_cache.pop(next(iter(self._inflection_cache)))
+            self._inflection_cache[sim_ms] = cached
+        return cached
+
+    def _inflection_points(self, sim_ms: int) -> CapacityCurve:
         # 2) only quotas (skip the base Rate)
         quotas = self.limits[1:]
         if not quotas:
             # no quotas → straight line from 0 to sim_ms
-            return [
+            return CapacityCurve.from_points([
                 (0.0, self.capacity_at("0s")),
                 (sim_ms, self.capacity_at(TimeDuration(sim_ms, TimeUnit.MILLISECOND)))
-            ]
-
-        # 3) exhaustion thresholds per quota
-        thresholds = self.quota_exhaustion_threshold(display=False)
-        if not isinstance(thresholds, list):
-            thresholds = [thresholds]
-
-        points: List[Tuple[float, float]] = []
-
-        # 4) for each quota generate start→exhaustion→plateau segments
-        for idx, quota in enumerate(quotas):
-            period_ms = int(quota.consumption_period.to_milliseconds())
-            t_ast = thresholds[idx]
-            if isinstance(t_ast, str):
-                t_ast = parse_time_string_to_duration(t_ast)
-            t_ast_ms = int(t_ast.to_milliseconds())
-
-            k = 0
-            while True:
-                start_ms = k * period_ms
-                if start_ms >= sim_ms:
-                    break
-
-                # 4a) start of window
-                points.append((start_ms,
-                               self.capacity_at(TimeDuration(start_ms, TimeUnit.MILLISECOND))))
-                # 4b) exhaustion point (clamped to sim_ms)
-                agot_ms = min(start_ms + t_ast_ms, sim_ms)
-                points.append((agot_ms,
-                               self.capacity_at(TimeDuration(agot_ms, TimeUnit.MILLISECOND))))
-                # 4c) plateau until window end
-                fin_ms = min((k + 1) * period_ms, sim_ms)
-                points.append((fin_ms,
-                               self.capacity_at(TimeDuration(agot_ms, TimeUnit.MILLISECOND))))
-
-                if fin_ms >= sim_ms:
-                    break
-                k += 1
-
-        # 5) ensure (0, cap0) if missing
-        if not any(t == 0 for t, _ in points):
-            points.append((0.0, self.capacity_at("0s")))
-
-        # 6) ensure (sim_ms, cap_sim) if missing
-        final_cap = self.capacity_at(TimeDuration(sim_ms, TimeUnit.MILLISECOND))
-        if not any(t == sim_ms for t, _ in points):
-            points.append((sim_ms, final_cap))
-        
-        # 6) ¡SIEMPRE! forzamos el punto final con capacity_at(sim_ms)
-        final_cap = self.capacity_at(TimeDuration(sim_ms, TimeUnit.MILLISECOND))   
-        points.append((sim_ms, final_cap))
-
-        # 7) dedupe and sort by time for pruning
-        time_sorted = sorted({(t, c) for t, c in points}, key=lambda x: x[0])
-
-        # 8) prune plateau points: drop any point whose capacity equals
+            ])
+
+        # 3) exhaustion threshold of each quota: first instant the curve reaches its
+        #    units (exact, the stack's thresholds are whole milliseconds)
+        stack = self.limit_stack
+        curve = self.periodic_curve
+        thresholds_ms = [curve.first_time_reaching(units) for units in stack.units[1:]]
+
+        times, capacities = [], []
+
+        # 4) for each quota generate start→exhaustion→plateau segments,
+        #    every window at once; the periodic curve answers each instant in O(log k)
+        for idx in range(len(quotas)):
+            # en float: un periodo con fracción de milisegundo no se recorta
+            period_ms = float(stack.periods_ms[idx + 1])
+            t_ast_ms = thresholds_ms[idx]
+
+            # 4a) start of every window before sim_ms
+            start_ms = np.arange(0, sim_ms, period_ms, dtype=np.float64)
+            # 4b) exhaustion point (clamped to sim_ms)
+            agot_ms = np.minimum(start_ms + t_ast_ms, sim_ms)
+            # 4c) plateau until window end
+            fin_ms = np.minimum(start_ms + period_ms, sim_ms)
+
+            agot_cap = curve.at_many(agot_ms)
+            times += [start_ms, agot_ms, fin_ms]
+            capacities += [curve.at_many(start_ms), agot_cap, agot_cap]
+
+        # 5) ensure (0, cap0) and ¡SIEMPRE! the final point with the capacity at sim_ms
+        times += [np.array([0.0, sim_ms])]
+        capacities += [np.array([curve.at(0), curve.at(sim_ms)])]
+
+        # 6) dedupe and sort by time for pruning
+        times, capacities = np.concatenate(times), np.concatenate(capacities)
+        order = np.lexsort((capacities, times))
+        t_sorted, c_sorted = times[order], capacities[order]
+        distinct = np.ones(len(t_sorted), dtype=bool)
+        distinct[1:] = (t_sorted[1:] != t_sorted[:-1]) | (c_sorted[1:] != c_sorted[:-1])
+        t_sorted, c_sorted = t_sorted[distinct], c_sorted[distinct]
+
+        # 7) prune plateau points: drop any point whose capacity equals
         #    both the previous and next capacity
-        def _prune_plateaus(pts: List[Tuple[float, float]]) -> List[Tuple[float, float]]:
-            if len(pts) <= 2:
-                return pts[:]
-            pruned = [pts[0]]
-            for prev, curr, nxt in zip(pts, pts[1:], pts[2:]):
-                if prev[1] == curr[1] == nxt[1]:
-                    continue
-                pruned.append(curr)
-            pruned.append(pts[-1])
-            return pruned
-
-        pruned = _prune_plateaus(time_sorted)
+        keep = np.ones(len(c_sorted), dtype=bool)
+        keep[1:-1] = ~((c_sorted[:-2] == c_sorted[1:-1]) & (c_sorted[1:-1] == c_sorted[2:]))
+        t_sorted, c_sorted = t_sorted[keep], c_sorted[keep]
 
-        # 9) final sort by time (para que siempre vayan de izquierda a derecha)
-        result = sorted(pruned, key=lambda x: (x[1], x[0]))
-        return result
+        # 8) ya van de izquierda a derecha; la capacidad nunca baja con el tiempo
+        return CapacityCurve(t_sorted, np.maximum.accumulate(c_sorted))
 
 
     
+    @instrumented
     def show_capacity_from_inflection_points(self,
                                     time_interval: Union[str, TimeDuration],
                                     return_fig: bool = False,
                                     debug: bool = False
-                                    ) -> Optional[Union[go.Figure, List[Tuple[float, float]]]]:
+                                    ) -> Optional[Union["go.Figure", CapacityCurve]]:
             """
             Dibuja **solo las pendientes** uniendo con líneas rectas los puntos de inflexión,
             rellena bajo la curva con verde translúcido.
@@ -1084,22 +1188,21 @@ class BoundedRate:
             if debug:
                 return raw_pts
                 
-            xs = [t / unit_ms for t, _ in raw_pts]
-            ys = [c for _, c in raw_pts]
-            tooltip_labels = [CapacityPlotHelper.format_time_tooltip(t/1000) for t, _ in raw_pts]
-
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(
-                x=xs,
-                y=ys,
-                customdata=tooltip_labels,
+            xs = raw_pts.breakpoints / unit_ms
+            ys = raw_pts.values
+            # plotly solo se carga al dibujar
+            from APICompass.ancillary.figure_builder import build_figure, time_tooltips, trace
+            fig = build_figure([trace(
+                xs,
+                ys,
+                customdata=time_tooltips(raw_pts.breakpoints),
                 hovertemplate="Time: %{customdata}<br>Capacity: %{y}<extra></extra>",
                 mode="lines",
                 line=dict(shape="linear", color="green", width=2),
                 fill="tozeroy",
                 fillcolor="rgba(0,128,0,0.2)",
                 name="Capacity"
-            ))
+            )])
 
 
             # 4) layout
@@ -1127,14 +1230,12 @@ class BoundedRate:
         Returns:
             List[TimeDuration]: Una lista de objetos TimeDuration que representan los tiempos t_ast para cada límite.
         """
-        exhaustion_thresholds = []
-
-        # Iterar sobre los límites para calcular cada t_ast
-        for object in self.limits:
-            if isinstance(object, Rate):
-                continue
-            exhaustion_thresholds.append(self.min_time(object.consumption_unit, display=display))
- 
+        # Los t_ast vienen precalculados en la pila compilada
+        exhaustion_thresholds = [
+            self._format_min_time(t_ast_ms, None, display)
+            for t_ast_ms in self.limit_stack.exhaustion_thresholds_ms
+        ]
+
         return exhaustion_thresholds[0] if len(exhaustion_thresholds) == 1 else exhaustion_thresholds
     
 if __name__ == "__main__":
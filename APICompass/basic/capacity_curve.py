@@ -0,0 +1,370 @@
+from bisect import bisect_right
+from math import ceil, floor, inf
+from typing import Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from APICompass.basic.limit_stack import LimitStack
+
+# Puntos máximos por traza que se envían a plotly (None desactiva el diezmado)
+DISPLAY_MAX_POINTS = 4000
+
+
+class CapacityCurve:
+    """
+    Piecewise-constant capacity curve backed by two contiguous NumPy arrays.
+
+    breakpoints[i] is the instant (ms) from which the curve takes values[i]. The
+    curve is right-continuous, 0 before the first breakpoint and flat after the
+    last one. Iterating yields (t_ms, capacity) tuples, so it can be used wherever
+    the old lists of points were.
+    """
+
+    __slots__ = ("breakpoints", "values", "_nondecreasing")
+
+    def __init__(self, breakpoints: np.ndarray, values: np.ndarray):
+        breakpoints = np.ascontiguousarray(breakpoints, dtype=np.float64)
+        values = np.ascontiguousarray(values, dtype=np.float64)
+        if breakpoints.shape != values.shape or breakpoints.ndim != 1:
+            raise ValueError("breakpoints and values must be 1-D arrays of the same length")
+        if breakpoints.size > 1 and np.any(breakpoints[1:] < breakpoints[:-1]):
+            raise ValueError("breakpoints must be sorted in ascending order")
+
+        breakpoints.flags.writeable = False
+        values.flags.writeable = False
+        set_attr = object.__setattr__
+        set_attr(self, "breakpoints", breakpoints)
+        set_attr(self, "values", values)
+        set_attr(self, "_nondecreasing", bool(values.size < 2 or np.all(values[1:] >= values[:-1])))
+
+    @classmethod
+    def from_points(cls, points: List[Tuple[float, float]]) -> "CapacityCurve":
+        """
+        Builds a curve from a list of (t_ms, capacity) tuples sorted by time.
+
+        Args:
+            points (List[Tuple[float, float]]): The points of the curve.
+
+        Returns:
+            CapacityCurve: The curve.
+        """
+        if not points:
+            return cls(np.empty(0), np.empty(0))
+        times, values = zip(*points)
+        return cls(np.array(times), np.array(values))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CapacityCurve is immutable")
+
+    def __repr__(self):
+        if not len(self):
+            return "CapacityCurve([])"
+        return f"CapacityCurve({len(self)} breakpoints, {self.breakpoints[0]}ms..{self.breakpoints[-1]}ms)"
+
+    def __len__(self) -> int:
+        return self.breakpoints.size
+
+    def __iter__(self) -> Iterator[Tuple[float, float]]:
+        return zip(self.breakpoints.tolist(), self.values.tolist())
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[Tuple[float, float], "CapacityCurve"]:
+        if isinstance(key, slice):
+            return CapacityCurve(self.breakpoints[key], self.values[key])
+        return float(self.breakpoints[key]), float(self.values[key])
+
+    @property
+    def horizon_ms(self) -> float:
+        return float(self.breakpoints[-1]) if len(self) else 0.0
+
+    @property
+    def nbytes(self) -> int:
+        return self.breakpoints.nbytes + self.values.nbytes
+
+    def to_list(self) -> List[Tuple[float, float]]:
+        return list(self)
+
+    def at(self, t_ms: float) -> float:
+        """
+        Capacity at a single instant.
+
+        Args:
+            t_ms (float): The instant in milliseconds.
+
+        Returns:
+            float: The capacity.
+        """
+        idx = bisect_right(self.breakpoints, t_ms) - 1
+        return float(self.values[idx]) if idx >= 0 else 0.0
+
+    def at_many(self, t_ms: np.ndarray) -> np.ndarray:
+        """
+        Capacity at many instants.
+
+        Args:
+            t_ms (np.ndarray): Instants in milliseconds.
+
+        Returns:
+            np.ndarray: The capacity at each instant, as float64.
+        """
+        idx = np.searchsorted(self.breakpoints, t_ms, side="right") - 1
+        if not len(self):
+            return np.zeros(idx.shape)
+        return np.where(idx >= 0, self.values[np.maximum(idx, 0)], 0.0)
+
+    def during(self, start_ms: float, end_ms: float) -> float:
+        """
+        Capacity gained between two instants, capacity(end) - capacity(start).
+
+        Args:
+            start_ms (float): The initial instant in milliseconds.
+            end_ms (float): The final instant in milliseconds.
+
+        Returns:
+            float: The capacity gained.
+        """
+        if end_ms <= start_ms:
+            raise ValueError("end_ms must be greater than start_ms")
+        return self.at(end_ms) - self.at(start_ms)
+
+    def first_time_reaching(self, capacity: float) -> float:
+        """
+        First instant at which the curve reaches a capacity.
+
+        Args:
+            capacity (float): The capacity to reach.
+
+        Returns:
+            float: The instant in milliseconds, or inf if the curve never reaches it.
+        """
+        if capacity <= 0:
+            return 0.0
+        if self._nondecreasing:
+            idx = int(np.searchsorted(self.values, capacity, side="left"))
+        else:
+            reached = self.values >= capacity
+            idx = int(np.argmax(reached)) if reached.any() else len(self)
+        return float(self.breakpoints[idx]) if idx < len(self) else inf
+
+    def first_time_reaching_many(self, capacities: np.ndarray) -> np.ndarray:
+        """
+        First instant at which the curve reaches each of many capacities.
+
+        Args:
+            capacities (np.ndarray): The capacities to reach.
+
+        Returns:
+            np.ndarray: The instants in milliseconds, inf where the curve never reaches them.
+        """
+        capacities = np.asarray(capacities, dtype=np.float64)
+        if self._nondecreasing:
+            idx = np.searchsorted(self.values, capacities, side="left")
+        else:
+            # máximo acumulado: el primer índice que alcanza c es el mismo
+            idx = np.searchsorted(np.maximum.accumulate(self.values), capacities, side="left")
+        times = np.append(self.breakpoints, inf)[idx]
+        return np.where(capacities <= 0, 0.0, times)
+
+    def decimate(self, max_points: Optional[int] = DISPLAY_MAX_POINTS) -> "CapacityCurve":
+        """
+        Reduced copy of the curve for display as an 'hv' step trace.
+
+        Breakpoints that repeat the previous value are dropped first, which does not
+        change the curve. If more than max_points remain, the time axis is split into
+        equal buckets and each bucket keeps its first, last, lowest and highest
+        breakpoint, so every step extreme of the original curve is still drawn and
+        a flat stretch stays flat. Nondecreasing curves use max_points // 2 buckets,
+        since their extremes are the first and last breakpoints; others use
+        max_points // 4.
+
+        Args:
+            max_points (Optional[int]): Maximum number of breakpoints to keep. None
+                keeps every breakpoint where the value changes.
+
+        Returns:
+            CapacityCurve: The decimated curve, starting and ending like the original.
+        """
+        n = len(self)
+        if n <= 2:
+            return self
+
+        # 1) sin pérdida: solo donde cambia el valor, más el último punto
+        keep = np.empty(n, dtype=bool)
+        keep[0] = keep[-1] = True
+        np.not_equal(self.values[1:-1], self.values[:-2], out=keep[1:-1])
+        times, values = self.breakpoints[keep], self.values[keep]
+
+        if max_points is None or times.size <= max(max_points, 4):
+            return self if times.size == n else CapacityCurve(times, values)
+
+        # 2) cubetas de igual duración: primero, último, mínimo y máximo de cada una
+        # (en una curva no decreciente coinciden con el primero y el último)
+        n_buckets = max(max_points // (2 if self._nondecreasing else 4), 1)
+        edges = times[0] + (times[-1] - times[0]) * (np.arange(n_buckets) / n_buckets)
+        starts = np.unique(np.searchsorted(times, edges, side="left"))
+        ends = np.append(starts[1:], times.size) - 1
+
+        selected = [starts, ends]
+        if not self._nondecreasing:
+            lengths = ends - starts + 1
+            for reduce in (np.minimum, np.maximum):
+                # primer punto de cada cubeta que alcanza su extremo
+                hits = np.flatnonzero(values == np.repeat(reduce.reduceat(values, starts), lengths))
+                selected.append(hits[np.searchsorted(hits, starts)])
+        selected = np.unique(np.concatenate(selected))
+        return CapacityCurve(times[selected], values[selected])
+
+
+class PeriodicCapacityCurve:
+    """
+    Accumulated capacity curve of a BoundedRate, stored as a single window.
+
+    If P and Q are the period and units of the outermost limit, the capacity
+    satisfies capacity(t + P) = capacity(t) + Q. Only the breakpoints of the first
+    window [0, P) are kept; any later instant is answered as
+    n*Q + capacity(t mod P) with a binary search inside the window.
+    """
+
+    __slots__ = ("window", "period_ms", "units")
+
+    def __init__(self, window: CapacityCurve, period_ms: float, units: float):
+        set_attr = object.__setattr__
+        set_attr(self, "window", window)
+        set_attr(self, "period_ms", float(period_ms))
+        set_attr(self, "units", units)
+
+    @classmethod
+    def from_stack(cls, stack: LimitStack) -> "PeriodicCapacityCurve":
+        """
+        Builds the curve from the exact breakpoints of the first window of a LimitStack.
+
+        Args:
+            stack (LimitStack): The compiled limits.
+
+        Returns:
+            PeriodicCapacityCurve: The compressed curve.
+        """
+        window = CapacityCurve(*stack.window_breakpoints())
+        return cls(window, stack.top_period_ms, stack.top_units)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("PeriodicCapacityCurve is immutable")
+
+    def __repr__(self):
+        return f"PeriodicCapacityCurve({len(self.window)} breakpoints per {self.period_ms}ms window, +{self.units})"
+
+    def at(self, t_ms: float) -> float:
+        """
+        Capacity at a single instant.
+
+        Args:
+            t_ms (float): The instant in milliseconds.
+
+        Returns:
+            float: The accumulated capacity.
+        """
+        n = floor(t_ms / self.period_ms)
+        return n * self.units + self.window.at(t_ms - n * self.period_ms)
+
+    def at_many(self, t_ms: np.ndarray) -> np.ndarray:
+        """
+        Capacity at many instants.
+
+        Args:
+            t_ms (np.ndarray): Instants in milliseconds.
+
+        Returns:
+            np.ndarray: The accumulated capacity at each instant, as float64.
+        """
+        t_ms = np.asarray(t_ms, dtype=np.float64)
+        n = np.floor(t_ms / self.period_ms)
+        return n * self.units + self.window.at_many(t_ms - n * self.period_ms)
+
+    def instantaneous_at_many(self, t_ms: np.ndarray) -> np.ndarray:
+        """
+        Capacity consumed inside the current window, capacity(t mod P), at many instants.
+
+        Args:
+            t_ms (np.ndarray): Instants in milliseconds.
+
+        Returns:
+            np.ndarray: The instantaneous capacity at each instant, as float64.
+        """
+        return self.window.at_many(np.mod(np.asarray(t_ms, dtype=np.float64), self.period_ms))
+
+    def first_time_reaching(self, capacity: float) -> float:
+        """
+        First instant at which the accumulated capacity reaches a value.
+
+        Args:
+            capacity (float): The capacity to reach.
+
+        Returns:
+            float: The instant in milliseconds.
+        """
+        window_max = self.window.values[-1]
+        n = max(ceil((capacity - window_max) / self.units), 0)
+        return n * self.period_ms + self.window.first_time_reaching(capacity - n * self.units)
+
+    def first_time_reaching_many(self, capacities: np.ndarray) -> np.ndarray:
+        """
+        First instant at which the accumulated capacity reaches each of many values.
+
+        Args:
+            capacities (np.ndarray): The capacities to reach.
+
+        Returns:
+            np.ndarray: The instants in milliseconds.
+        """
+        capacities = np.asarray(capacities, dtype=np.float64)
+        n = np.maximum(np.ceil((capacities - self.window.values[-1]) / self.units), 0)
+        return n * self.period_ms + self.window.first_time_reaching_many(capacities - n * self.units)
+
+    def accumulated(self, horizon_ms: float) -> CapacityCurve:
+        """
+        Accumulated curve up to a horizon, closed with the horizon itself.
+
+        Args:
+            horizon_ms (float): The horizon in milliseconds.
+
+        Returns:
+            CapacityCurve: The accumulated capacity curve.
+        """
+        times, n = self._tile(horizon_ms)
+        values = (n[:, None] * self.units + self.window.values[None, :]).ravel()[:times.size]
+        return _close_at(times, values, horizon_ms)
+
+    def instantaneous(self, horizon_ms: float) -> CapacityCurve:
+        """
+        Instantaneous curve, capacity(t mod P), up to a horizon.
+
+        Args:
+            horizon_ms (float): The horizon in milliseconds.
+
+        Returns:
+            CapacityCurve: The instantaneous capacity curve.
+        """
+        times, n = self._tile(horizon_ms)
+        window_values = self.window.values
+        values = np.broadcast_to(window_values, (n.size, window_values.size)).ravel()[:times.size]
+
+        # quitar tramos repetidos (p. ej. una rate sin cuotas es constante)
+        changes = np.empty(values.size, dtype=bool)
+        changes[0] = True
+        np.not_equal(values[1:], values[:-1], out=changes[1:])
+
+        return _close_at(times[changes], values[changes], horizon_ms)
+
+    def _tile(self, horizon_ms: float) -> Tuple[np.ndarray, np.ndarray]:
+        # Window breakpoints shifted by n*P up to the horizon; times are sorted, so
+        # the ones past the horizon are a suffix.
+        n = np.arange(floor(horizon_ms / self.period_ms) + 1, dtype=np.float64)
+        times = (n[:, None] * self.period_ms + self.window.breakpoints[None, :]).ravel()
+        last = int(np.searchsorted(times, horizon_ms, side="right"))
+        return times[:last], n
+
+
+def _close_at(times: np.ndarray, values: np.ndarray, horizon_ms: float) -> CapacityCurve:
+    if times[-1] < horizon_ms:
+        times = np.append(times, float(horizon_ms))
+        values = np.append(values, values[-1])
+    return CapacityCurve(times, values)
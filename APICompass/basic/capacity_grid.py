@@ -0,0 +1,103 @@
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+from APICompass.basic.bounded_rate import BoundedRate
+
+# Filas por bloque al contar la densidad
+_DENSITY_BLOCK_ROWS = 64
+
+
+def shared_time_grid(horizon_ms: float, n_points: int) -> np.ndarray:
+    """
+    Evenly spaced instants shared by every curve of a comparison.
+
+    Args:
+        horizon_ms (float): The last instant, in milliseconds.
+        n_points (int): Number of instants, including 0 and the horizon.
+
+    Returns:
+        np.ndarray: The instants in milliseconds.
+    """
+    if n_points < 2:
+        raise ValueError("n_points must be at least 2")
+    return np.linspace(0.0, float(horizon_ms), n_points)
+
+
+def capacity_matrix(
+    bounded_rates: Sequence[BoundedRate],
+    t_ms: np.ndarray,
+    instantaneous: bool = False
+) -> np.ndarray:
+    """
+    Capacity of many bounded rates on one time grid, as a (curves x instants) matrix.
+
+    Each row is filled in place by one vectorized lookup in the compressed window
+    of its bounded rate, so memory is the matrix itself. Equal bounded rates are
+    evaluated once and their row is copied. Instants after the max_active_time
+    of a bounded rate are NaN, since its curve ends there.
+
+    Args:
+        bounded_rates (Sequence[BoundedRate]): The bounded rates to evaluate.
+        t_ms (np.ndarray): Sorted instants in milliseconds.
+        instantaneous (bool): Evaluate capacity(t mod P) instead of the accumulated capacity.
+
+    Returns:
+        np.ndarray: float64 matrix of shape (len(bounded_rates), len(t_ms)).
+    """
+    t_ms = np.asarray(t_ms, dtype=np.float64)
+    out = np.full((len(bounded_rates), t_ms.size), np.nan)
+    first_row: Dict[BoundedRate, int] = {}
+
+    for i, br in enumerate(bounded_rates):
+        if br in first_row:
+            out[i] = out[first_row[br]]
+            continue
+        first_row[br] = i
+
+        end = t_ms.size
+        if br.max_active_time is not None:
+            end = int(np.searchsorted(t_ms, br.max_active_time.to_milliseconds(), side="right"))
+
+        curve = br.periodic_curve
+        evaluate = curve.instantaneous_at_many if instantaneous else curve.at_many
+        out[i, :end] = evaluate(t_ms[:end])
+    return out
+
+
+def capacity_density(
+    matrix: np.ndarray,
+    n_bins: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Number of curves in each capacity band at each instant, for density views.
+
+    Args:
+        matrix (np.ndarray): A (curves x instants) matrix from capacity_matrix.
+        n_bins (int): Number of capacity bands.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The band centers and an (n_bins x instants)
+            matrix of counts. NaN entries are not counted.
+    """
+    finite = np.isfinite(matrix)
+    low = float(np.min(matrix, where=finite, initial=np.inf)) if finite.any() else 0.0
+    high = float(np.max(matrix, where=finite, initial=-np.inf)) if finite.any() else 1.0
+    if high <= low:
+        high = low + 1.0
+    del finite
+
+    n_instants = matrix.shape[1]
+    scale = n_bins / (high - low)
+    counts = np.zeros(n_bins * n_instants, dtype=np.int64)
+
+    # 1) por bloques de filas, con un bincount sobre (banda, instante) aplanado,
+    #    para que los temporales no superen el tamaño de un bloque
+    for start in range(0, matrix.shape[0], _DENSITY_BLOCK_ROWS):
+        block = matrix[start:start + _DENSITY_BLOCK_ROWS]
+        rows, cols = np.nonzero(np.isfinite(block))
+        bins = np.minimum(((block[rows, cols] - low) * scale).astype(np.int64), n_bins - 1)
+        counts += np.bincount(bins * n_instants + cols, minlength=counts.size)
+
+    edges = np.linspace(low, high, n_bins + 1)
+    return (edges[:-1] + edges[1:]) / 2, counts.reshape(n_bins, n_instants)
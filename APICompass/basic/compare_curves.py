@@ -1,13 +1,21 @@
 import re
 from typing import List, Optional, Union
+import numpy as np
 import plotly.graph_objects as go
 from APICompass.basic.bounded_rate import Rate, Quota, BoundedRate
 from APICompass.ancillary.time_unit import TimeDuration, TimeUnit
-from APICompass.ancillary.CapacityPlotHelper import CapacityPlotHelper
-from matplotlib.colors import to_rgba
+from APICompass.ancillary.figure_builder import build_figure, fill_color, palette, time_tooltips, trace
+from APICompass.basic.capacity_curve import DISPLAY_MAX_POINTS
+from APICompass.basic.capacity_grid import capacity_density, capacity_matrix, shared_time_grid
 from APICompass.utils import parse_time_string_to_duration
+from APICompass.instrumentation import instrumented
 
-def compare_rates_capacity(rates: List[Rate], time_interval: Union[str, TimeDuration], return_fig=False):
+# Por encima de este número de curvas la vista 'auto' de la rejilla pasa a mapa de densidad
+GRID_MAX_LINES = 200
+
+@instrumented
+def compare_rates_capacity(rates: List[Rate], time_interval: Union[str, TimeDuration], return_fig=False,
+                           max_points: Optional[int] = DISPLAY_MAX_POINTS):
     """
     Compares the capacity curves of a list of rates, starting with the slowest.
 
@@ -15,6 +23,7 @@ def compare_rates_capacity(rates: List[Rate], time_interval: Union[str, TimeDura
         rates (List[Rate]): List of rates to compare.
         time_interval (Union[str, TimeDuration]): The time interval for generating the curves.
         return_fig (bool, optional): Whether to return the figure. Defaults to False.
+        max_points (Optional[int], optional): Maximum points per trace; None plots every step.
     """
     if isinstance(time_interval, str):
         time_interval = parse_time_string_to_duration(time_interval)
@@ -22,34 +31,27 @@ def compare_rates_capacity(rates: List[Rate], time_interval: Union[str, TimeDura
     # Sort rates by speed (slowest first)
     rates.sort(key=lambda rate: rate.consumption_period.to_milliseconds() / rate.consumption_unit, reverse=False)
 
-    predefined_colors = ["green", "blue", "orange",  "red", "purple", "brown", "pink", "gray", "olive", "cyan"]
-
-    if len(rates) > len(predefined_colors):
-        raise ValueError("Not enough colors available for all rates.")
-
-    fig = go.Figure()
+    traces = []
 
     # Añadimos índice i para controlar el fill
-    for i, (rate, color) in enumerate(zip(rates, predefined_colors)):
-        debug_values = rate.show_capacity(time_interval, debug=True)
-        times_ms, capacities = zip(*debug_values)
-        original_times = [t / time_interval.unit.to_milliseconds() for t in times_ms]
-
-        rgba_color = (
-            f"rgba({','.join(map(str, [int(c * 255) for c in to_rgba(color)[:3]]))},0.2)"
-        )
+    for i, (rate, color) in enumerate(zip(rates, palette(len(rates)))):
+        curve = rate.show_capacity(time_interval, debug=True).decimate(max_points)
+        original_times = curve.breakpoints / time_interval.unit.to_milliseconds()
+        capacities = curve.values
 
         # Solo se muestra la curva acumulada
-        fig.add_trace(go.Scatter(
-            x=original_times,
-            y=capacities,
+        traces.append(trace(
+            original_times,
+            capacities,
             mode='lines',
             line=dict(color=color, shape='hv', width=1.3),
             fill='tozeroy' if i == 0 else 'tonexty',
-            fillcolor=rgba_color,
+            fillcolor=fill_color(color, 0.2),
             name=f"Accumulated Rate ({rate.consumption_unit}/{rate.consumption_period})"
         ))
 
+    fig = build_figure(traces)
+
     # Configuración del diseño
     fig.update_layout(
         title="Accumulated Capacity",
@@ -68,6 +70,7 @@ def compare_rates_capacity(rates: List[Rate], time_interval: Union[str, TimeDura
     fig.show()
 
 
+@instrumented
 def compare_bounded_rates_capacity_inflection_points(
     bounded_rates: List[BoundedRate],
     time_interval: Union[str, TimeDuration],
@@ -90,40 +93,31 @@ def compare_bounded_rates_capacity_inflection_points(
     #    key=lambda br: br.rate.consumption_period.to_milliseconds() / br.rate.consumption_unit
     #)
 
-    predefined_colors = ["green", "blue", "orange",  "red", "purple", "brown", "pink", "gray", "olive", "cyan"]
-
-    if len(bounded_rates) > len(predefined_colors):
-        raise ValueError("Not enough colors available.")
-
-    fig = go.Figure()
+    traces = []
     unit_ms = time_interval.unit.to_milliseconds()
 
-    for i, (br, color) in enumerate(zip(bounded_rates, predefined_colors)):
+    for i, (br, color) in enumerate(zip(bounded_rates, palette(len(bounded_rates)))):
         # Obtener los puntos de inflexión en modo debug
         inflection_points = br.show_capacity_from_inflection_points(time_interval, debug=True)
 
-        x_vals = [t / unit_ms for t, _ in inflection_points]
-        print(x_vals)
-        print(unit_ms)
-        capacities = [cap for _, cap in inflection_points]
-
-        rgba = f"rgba({','.join(map(str, [int(c * 255) for c in to_rgba(color)[:3]]))},0.2)"
+        x_vals = inflection_points.breakpoints / unit_ms
+        capacities = inflection_points.values
         legend_label = f"{br.rate.consumption_unit}/{br.rate.consumption_period}"
 
-        tooltip_labels = [CapacityPlotHelper.format_time_tooltip((t * unit_ms)/1000) for t in x_vals]
-
-        fig.add_trace(go.Scatter(
-            x=x_vals,
-            y=capacities,
-            customdata=tooltip_labels,
+        traces.append(trace(
+            x_vals,
+            capacities,
+            customdata=time_tooltips(inflection_points.breakpoints),
             hovertemplate="Time: %{customdata}<br>Capacity: %{y}<extra></extra>",
             mode='lines',
             line=dict(color=color, shape='linear', width=2),
             fill='tozeroy',
-            fillcolor=rgba,
+            fillcolor=fill_color(color, 0.2),
             name=legend_label
         ))
 
+    fig = build_figure(traces)
+
     fig.update_layout(
         title="Capacity Curve (Slopes Only)",
         xaxis_title=f"Time ({time_interval.unit.value})",
@@ -140,15 +134,31 @@ def compare_bounded_rates_capacity_inflection_points(
 
 
 
+def _legend_label(br: BoundedRate) -> str:
+    # Leyenda personalizada: rate, cuota más externa y duración
+    legend_label = f"{br.rate.consumption_unit}/{br.rate.consumption_period}"
+    if len(br.limits) > 1:
+        q = br.limits[-1]
+        legend_label += f" ·{q.consumption_unit}/{q.consumption_period}"
+    if getattr(br, "max_active_time", None):
+        d = br.max_active_time
+        legend_label += f" during {d.value}{d.unit.value}"
+    return legend_label
+
+
+@instrumented
 def compare_bounded_rates_capacity(
     bounded_rates: List[BoundedRate],
     time_interval: Union[str, TimeDuration],
-    return_fig: bool = False
+    return_fig: bool = False,
+    max_points: Optional[int] = DISPLAY_MAX_POINTS
 ):
     """
     Compara las curvas de capacidad (acumulada vs. instantánea) de una lista de BoundedRate,
     empezando por la más lenta. Si el tiempo de simulación >= la cuota máxima y existen cuotas,
     permite alternar entre vista acumulada e instantánea.
+
+    Cada traza se diezma a max_points puntos como mucho (None dibuja todos los escalones).
     """
     if isinstance(time_interval, str):
         time_interval = parse_time_string_to_duration(time_interval)
@@ -158,38 +168,24 @@ def compare_bounded_rates_capacity(
     #    key=lambda br: br.rate.consumption_period.to_milliseconds() / br.rate.consumption_unit
     #)
 
-    # Colores predefinidos
-    predefined_colors = ["green", "blue", "orange",  "red", "purple", "brown", "pink", "gray", "olive", "cyan"]
-    if len(bounded_rates) > len(predefined_colors):
-        raise ValueError("Not enough colors available for all bounded rates.")
-
-    fig = go.Figure()
+    traces = []
     unit_ms = time_interval.unit.to_milliseconds()
     sim_ms = int(time_interval.to_milliseconds())
     trace_idx = 0
 
-    for br, color in zip(bounded_rates, predefined_colors):
-        # Construir la leyenda personalizada
-        rate_part = f"{br.rate.consumption_unit}/{br.rate.consumption_period}"
-        legend_label = rate_part
-        if len(br.limits) > 1:
-            q = br.limits[-1]
-            legend_label += f" ·{q.consumption_unit}/{q.consumption_period}"
-        if getattr(br, "max_active_time", None):
-            d = br.max_active_time
-            legend_label += f" during {d.value}{d.unit.value}"
+    for br, color in zip(bounded_rates, palette(len(bounded_rates))):
+        legend_label = _legend_label(br)
 
-        rgba = f"rgba({','.join(map(str, [int(c*255) for c in to_rgba(color)[:3]]))},0.2)"
+        rgba = fill_color(color, 0.2)
 
         # --- acumulada ---
-        debug_acc = br.show_available_capacity_curve(time_interval, debug=True)
-        times_acc, caps_acc = zip(*debug_acc)
-        x_acc = [t / unit_ms for t in times_acc]
+        curve_acc = br.show_available_capacity_curve(time_interval, debug=True).decimate(max_points)
+        x_acc = curve_acc.breakpoints / unit_ms
 
         fill_mode = "tozeroy" if trace_idx != 0 else "tonexty"
-        fig.add_trace(go.Scatter(
-            x=x_acc,
-            y=list(caps_acc),
+        traces.append(trace(
+            x_acc,
+            curve_acc.values,
             mode='lines',
             line=dict(color=color, shape='hv', width=1.3),
             fill=fill_mode,
@@ -204,14 +200,14 @@ def compare_bounded_rates_capacity(
         # --- instantánea (solo si hay cuota y el intervalo supera esa cuota) ---
         max_quota_ms = br.limits[-1].consumption_period.to_milliseconds()
         if len(br.limits) > 1 and sim_ms >= max_quota_ms:
-            debug_inst = br.show_instantaneous_capacity_curve(time_interval, debug=True)
-            times_inst, caps_inst = zip(*debug_inst)
-            x_inst = [t / unit_ms for t in times_inst]
+            curve_inst = br.show_instantaneous_capacity_curve(time_interval, debug=True).decimate(max_points)
+            x_inst = curve_inst.breakpoints / unit_ms
 
             fill_mode = "tozeroy" if trace_idx == 0 else "tonexty"
-            fig.add_trace(go.Scattergl(
-                x=x_inst,
-                y=list(caps_inst),
+            traces.append(trace(
+                x_inst,
+                curve_inst.values,
+                trace_type='scattergl',
                 mode='lines',
                 line=dict(color=color, shape='hv', width=1.3),
                 fill=fill_mode,
@@ -223,6 +219,8 @@ def compare_bounded_rates_capacity(
             ))
             trace_idx += 1
 
+    fig = build_figure(traces)
+
     # Botones solo si hay instantáneas
     #n_acc = sum("Accumulated" or True for _ in range(trace_idx))  # no los usamos aquí
     n_inst = sum(1 for tr in fig.data if tr.showlegend==False)
@@ -272,6 +270,82 @@ def compare_bounded_rates_capacity(
     fig.show()
 
 
+@instrumented
+def compare_bounded_rates_capacity_grid(
+    bounded_rates: List[BoundedRate],
+    time_interval: Union[str, TimeDuration],
+    n_points: int = DISPLAY_MAX_POINTS,
+    view: str = "auto",
+    max_lines: int = GRID_MAX_LINES,
+    names: Optional[List[str]] = None,
+    instantaneous: bool = False,
+    density_bins: int = 200,
+    return_fig: bool = False
+):
+    """
+    Compara muchas BoundedRate (cientos o miles) evaluándolas en una rejilla de
+    tiempo común con capacity_matrix, sin construir cada curva por separado.
+    La memoria es la de la matriz (curvas x n_points).
+
+    Args:
+        bounded_rates (List[BoundedRate]): The bounded rates to compare.
+        time_interval (Union[str, TimeDuration]): The time interval of the comparison.
+        n_points (int): Instants of the shared grid.
+        view (str): 'lines' (one Scattergl trace per curve), 'heatmap' (number of
+            curves per capacity band and instant) or 'auto' (lines up to max_lines curves).
+        max_lines (int): Largest number of curves drawn as lines in 'auto' view.
+        names (Optional[List[str]]): Legend names, one per bounded rate.
+        instantaneous (bool): Compare capacity(t mod P) instead of the accumulated capacity.
+        density_bins (int): Capacity bands of the heatmap view.
+        return_fig (bool): Whether to return the figure.
+    """
+    if view not in ("auto", "lines", "heatmap"):
+        raise ValueError("view must be 'auto', 'lines' or 'heatmap'")
+    if names is not None and len(names) != len(bounded_rates):
+        raise ValueError("names must have one entry per bounded rate")
+    if isinstance(time_interval, str):
+        time_interval = parse_time_string_to_duration(time_interval)
+
+    unit_ms = time_interval.unit.to_milliseconds()
+    t_ms = shared_time_grid(time_interval.to_milliseconds(), n_points)
+    matrix = capacity_matrix(bounded_rates, t_ms, instantaneous=instantaneous)
+    x = t_ms / unit_ms
+    kind = "Instantaneous" if instantaneous else "Accumulated"
+
+    if view == "auto":
+        view = "lines" if len(bounded_rates) <= max_lines else "heatmap"
+
+    if view == "lines":
+        # todas las trazas comparten el mismo array x
+        labels = names or [_legend_label(br) for br in bounded_rates]
+        fig = build_figure(
+            trace(x, row, trace_type='scattergl', mode='lines',
+                  line=dict(color=color, shape='hv', width=1), name=label)
+            for row, color, label in zip(matrix, palette(len(bounded_rates)), labels)
+        )
+        fig.update_layout(legend_title="Bounded Rates", showlegend=len(bounded_rates) <= max_lines)
+    else:
+        centers, counts = capacity_density(matrix, density_bins)
+        fig = build_figure([dict(
+            type='heatmap', x=x, y=centers, z=np.where(counts > 0, counts, np.nan),
+            colorscale='Viridis', colorbar=dict(title="Curves"),
+            hovertemplate="Time: %{x}<br>Capacity: %{y}<br>Curves: %{z}<extra></extra>"
+        )])
+
+    fig.update_layout(
+        title=f"{kind} Capacity of {len(bounded_rates)} Bounded Rates",
+        xaxis_title=f"Time ({time_interval.unit.value})",
+        yaxis_title="Capacity",
+        template="plotly_white",
+        width=1200,
+        height=700
+    )
+
+    if return_fig:
+        return fig
+    fig.show()
+
+
 def show_line(
     fig: go.Figure,
     *,
@@ -0,0 +1,285 @@
+from math import ceil, floor, inf
+from typing import Sequence, Tuple
+
+import numpy as np
+
+
+class LimitStack:
+    """
+    Compiled, immutable form of the limits of a BoundedRate.
+
+    Level 0 is the rate and the last level is the outermost quota. Units and
+    periods (in milliseconds) are kept as parallel tuples for the scalar path and
+    as NumPy arrays for the vectorized one, so evaluating the capacity never goes
+    through TimeUnit conversions.
+    """
+
+    __slots__ = (
+        "units",
+        "periods_ms",
+        "units_array",
+        "periods_ms_array",
+        "depth",
+        "exhaustion_thresholds_ms",
+    )
+
+    def __init__(self, units: Sequence[float], periods_ms: Sequence[float]):
+        if len(units) != len(periods_ms) or not units:
+            raise ValueError("units and periods_ms must be non-empty and have the same length")
+
+        set_attr = object.__setattr__
+        set_attr(self, "units", tuple(units))
+        set_attr(self, "periods_ms", tuple(float(p) for p in periods_ms))
+        set_attr(self, "units_array", np.asarray(self.units, dtype=np.float64))
+        set_attr(self, "periods_ms_array", np.asarray(self.periods_ms, dtype=np.float64))
+        set_attr(self, "depth", len(self.units))
+        self.units_array.flags.writeable = False
+        self.periods_ms_array.flags.writeable = False
+
+        # t* de cada cuota: tiempo mínimo para consumir sus unidades
+        set_attr(self, "exhaustion_thresholds_ms", tuple(
+            self.min_time_ms(units) for units in self.units[1:]
+        ))
+
+    @classmethod
+    def from_limits(cls, limits) -> "LimitStack":
+        """
+        Compiles a list of limits (a Rate followed by its Quotas).
+
+        Args:
+            limits (List[Union[Rate, Quota]]): The limits, rate first.
+
+        Returns:
+            LimitStack: The compiled stack.
+        """
+        return cls(
+            [limit.consumption_unit for limit in limits],
+            [limit.consumption_period.to_milliseconds() for limit in limits],
+        )
+
+    def __setattr__(self, name, value):
+        raise AttributeError("LimitStack is immutable")
+
+    def __repr__(self):
+        levels = ", ".join(f"{u}/{p}ms" for u, p in zip(self.units, self.periods_ms))
+        return f"LimitStack({levels})"
+
+    @property
+    def rate_units(self) -> float:
+        return self.units[0]
+
+    @property
+    def rate_period_ms(self) -> float:
+        return self.periods_ms[0]
+
+    @property
+    def top_units(self) -> float:
+        return self.units[-1]
+
+    @property
+    def top_period_ms(self) -> float:
+        return self.periods_ms[-1]
+
+    def capacity_at(self, t_ms: float) -> float:
+        """
+        Calculates the effective capacity at a single instant.
+
+        Args:
+            t_ms (float): The instant in milliseconds.
+
+        Returns:
+            float: The effective capacity.
+        """
+        return capacity_at(self.units, self.periods_ms, t_ms)
+
+    def capacity_at_many(self, t_ms: np.ndarray) -> np.ndarray:
+        """
+        Calculates the effective capacity at many instants in a single vectorized pass.
+
+        Args:
+            t_ms (np.ndarray): Instants in milliseconds (int64 or float64).
+
+        Returns:
+            np.ndarray: The effective capacity at each instant, as float64.
+        """
+        units, periods = self.units, self.periods_ms
+        remainder = np.asarray(t_ms, dtype=np.float64)
+
+        bases = []
+        for level in range(self.depth - 1, 0, -1):
+            ni = np.floor(remainder / periods[level])
+            bases.append(units[level] * ni)
+            remainder = remainder - ni * periods[level]
+
+        c = units[0] * np.floor((remainder / periods[0]) + 1)
+        for level in range(1, self.depth):
+            c = bases[-level] + np.minimum(c, units[level])
+
+        return c
+
+    def binding_level(self, t_ms: float) -> int:
+        """
+        Level of the limit that bounds the capacity at an instant: the outermost
+        quota already exhausted inside its current window, or 0 (the rate) if none is.
+
+        Args:
+            t_ms (float): The instant in milliseconds.
+
+        Returns:
+            int: The index of the binding limit (0 is the rate).
+        """
+        units, periods = self.units, self.periods_ms
+
+        bases = []
+        remainder = t_ms
+        for level in range(self.depth - 1, 0, -1):
+            ni = floor(remainder / periods[level])
+            bases.append(units[level] * ni)
+            remainder = remainder - ni * periods[level]
+
+        binding = 0
+        c = units[0] * floor((remainder / periods[0]) + 1)
+        for level in range(1, self.depth):
+            if c >= units[level]:
+                binding = level
+            c = bases[-level] + min(c, units[level])
+
+        return binding
+
+    def min_time_ms(self, capacity_goal: int) -> int:
+        """
+        Calculates the minimum time, in milliseconds, to reach a capacity goal.
+
+        Args:
+            capacity_goal (int): The capacity goal to reach.
+
+        Returns:
+            int: The minimum time in milliseconds.
+        """
+        units, periods = self.units, self.periods_ms
+
+        # 1) consumir ventanas completas de cada cuota, de mayor a menor
+        T = 0
+        for level in range(self.depth - 1, 0, -1):
+            if capacity_goal <= 0:
+                break
+            nu = floor(capacity_goal / units[level])
+            n_i = nu - 1 if capacity_goal == nu * units[level] else nu
+            T += n_i * periods[level]
+            capacity_goal -= n_i * units[level]
+
+        # 2) batch inicial de la rate
+        if capacity_goal > units[0]:
+            T += (ceil(capacity_goal / units[0]) - 1) * periods[0]
+
+        return int(T)
+
+    def min_time_ms_many(self, capacity_goals: np.ndarray) -> np.ndarray:
+        """
+        Calculates the minimum time, in milliseconds, to reach many capacity goals at once.
+
+        Args:
+            capacity_goals (np.ndarray): The capacity goals to reach.
+
+        Returns:
+            np.ndarray: The minimum time for each goal in milliseconds, as int64.
+        """
+        units, periods = self.units, self.periods_ms
+        goals = np.asarray(capacity_goals, dtype=np.float64)
+        T = np.zeros(goals.shape)
+
+        # 1) consumir ventanas completas de cada cuota; los objetivos ya cubiertos no avanzan
+        for level in range(self.depth - 1, 0, -1):
+            nu = np.floor(goals / units[level])
+            n_i = np.where(goals == nu * units[level], nu - 1, nu)
+            n_i = np.where(goals > 0, n_i, 0)
+            T += n_i * periods[level]
+            goals = goals - n_i * units[level]
+
+        # 2) batch inicial de la rate
+        T += np.where(goals > units[0], (np.ceil(goals / units[0]) - 1) * periods[0], 0)
+
+        return T.astype(np.int64)
+
+    def window_breakpoints(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Exact breakpoints of the capacity curve inside the first window of the
+        outermost limit, [0, top_period_ms).
+
+        The curve is a step function that only changes at rate ticks that happen
+        before each quota is exhausted and at quota window boundaries, so the
+        breakpoints are built from the nested limit structure instead of sampling
+        every rate period.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Breakpoint instants (ms) and capacities.
+        """
+        return self._level_breakpoints(self.depth - 1, self.top_period_ms, False, inf)
+
+    def _level_breakpoints(self, level: int, end: float, closed: bool, cap: float) -> Tuple[np.ndarray, np.ndarray]:
+        # Breakpoints of the capacity of limits[:level + 1] on [0, end] (closed) or
+        # [0, end) (open), stopping at the first one whose value reaches cap.
+        units, period = self.units[level], self.periods_ms[level]
+
+        if level == 0:
+            last_tick = floor(end / period) if closed else ceil(end / period) - 1
+            if cap != inf:
+                last_tick = min(last_tick, ceil(cap / units) - 1)
+            k = np.arange(max(last_tick, 0) + 1, dtype=np.float64)
+            times, values = k * period, units * (k + 1)
+        else:
+            # 1) una sola ventana de este nivel: la curva inferior truncada en units
+            inner_closed = closed and end < period
+            inner_t, inner_v = self._level_breakpoints(level - 1, min(end, period), inner_closed, units)
+            exhausted = int(np.searchsorted(inner_v, units, side="left"))
+            window_t = inner_t[:exhausted + 1]
+            window_v = np.minimum(inner_v[:exhausted + 1], units)
+
+            # 2) repetir la ventana desplazada n*period en tiempo y n*units en capacidad
+            last_window = floor(end / period) if closed else ceil(end / period) - 1
+            if cap != inf:
+                last_window = min(last_window, max(ceil((cap - window_v[-1]) / units), 0))
+            n = np.arange(max(last_window, 0) + 1, dtype=np.float64)
+            times = (n[:, None] * period + window_t[None, :]).ravel()
+            values = (n[:, None] * units + window_v[None, :]).ravel()
+
+        keep = times <= end if closed else times < end
+        keep[0] = True
+        times, values = times[keep], values[keep]
+
+        if cap != inf:
+            reached = int(np.searchsorted(values, cap, side="left"))
+            times, values = times[:reached + 1], values[:reached + 1]
+
+        return times, values
+
+
+def capacity_at(units: Sequence[float], periods_ms: Sequence[float], t_ms: float) -> float:
+    """
+    Effective capacity at an instant of the limits given as parallel sequences,
+    rate first. Used by LimitStack and by code that grows the limits one at a time.
+
+    Args:
+        units (Sequence[float]): Units of every limit.
+        periods_ms (Sequence[float]): Periods of every limit in milliseconds.
+        t_ms (float): The instant in milliseconds.
+
+    Returns:
+        float: The effective capacity.
+    """
+    depth = len(units)
+
+    # 1) de la cuota más externa a la rate: número de ventana y resto
+    bases = []
+    remainder = t_ms
+    for level in range(depth - 1, 0, -1):
+        ni = floor(remainder / periods_ms[level])
+        bases.append(units[level] * ni)
+        remainder = remainder - ni * periods_ms[level]
+
+    # 2) capacidad de la rate sobre el resto y rampas hacia arriba
+    c = units[0] * floor((remainder / periods_ms[0]) + 1)
+    for level in range(1, depth):
+        c = bases[-level] + min(c, units[level])
+
+    return float(c)
@@ -0,0 +1,361 @@
+"""
+Min-plus operators on capacity curves.
+
+Plan capacity curves are service curves and demand curves are arrival curves.
+As usual in network calculus every curve is 0 at t = 0, so the value a
+CapacityCurve stores at its breakpoint 0 is the limit for t -> 0+ (the burst
+available at once), and all curves are nondecreasing step functions.
+"""
+from dataclasses import dataclass
+from math import floor
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+from APICompass.basic.capacity_curve import CapacityCurve, PeriodicCapacityCurve
+
+ServiceCurve = Union[CapacityCurve, PeriodicCapacityCurve]
+
+# Peticiones por bloque en request_delays
+REQUEST_BLOCK = 1 << 20
+
+
+@dataclass(frozen=True)
+class ServiceBounds:
+    """
+    Worst-case bounds of a demand (arrival curve) served by a plan (service curve).
+
+    backlog is the vertical deviation, the most requests waiting at any instant,
+    reached at backlog_time_ms. delay_ms is the horizontal deviation, the longest
+    wait of any request, for the requests issued at delay_time_ms. delay_ms is
+    inf if the plan never serves the whole demand.
+    """
+    backlog: float
+    backlog_time_ms: float
+    delay_ms: float
+    delay_time_ms: float
+
+
+@dataclass(frozen=True, eq=False)
+class RequestDelays:
+    """
+    Wait of every request of a demand served in order by a plan: delays_ms[k] is
+    the time from the instant the (k+1)-th request is issued to the instant the
+    plan has capacity for it. Percentiles are nearest-rank, so p99_ms is a wait
+    that 99% of the requests do not exceed.
+    """
+    delays_ms: np.ndarray
+    p50_ms: float
+    p99_ms: float
+    max_ms: float
+
+    def percentile(self, q: float) -> float:
+        """
+        Nearest-rank percentile of the delays.
+
+        Args:
+            q (float): The percentile, between 0 and 100.
+
+        Returns:
+            float: The delay in milliseconds (inf if some of those requests are never served).
+        """
+        if not self.delays_ms.size:
+            return 0.0
+        return float(np.percentile(self.delays_ms, q, method="inverted_cdf"))
+
+
+def min_plus_convolution(
+    f: CapacityCurve,
+    g: CapacityCurve,
+    horizon_ms: Optional[float] = None
+) -> CapacityCurve:
+    """
+    Min-plus convolution (f ⊗ g)(t) = min over 0 <= s <= t of f(s) + g(t - s).
+
+    For step curves the minimum is taken either at s = 0, at s = t, or just before
+    a step of f ends, so the result is the lower envelope of f, g and one copy of
+    g per step of f, shifted to the end of the step and raised by its level. The
+    copies are merged into the envelope one at a time, and each one only over the
+    instants where it can still lower it, so most of them cost nothing. The
+    worst case is O(len(f) * len(g)), as for any exact convolution of step curves.
+
+    Args:
+        f (CapacityCurve): Nondecreasing capacity curve.
+        g (CapacityCurve): Nondecreasing capacity curve.
+        horizon_ms (Optional[float]): Last instant of the result. Defaults to the
+            shortest of both curves.
+
+    Returns:
+        CapacityCurve: The convolution up to the horizon, closed at the horizon.
+    """
+    _check_nondecreasing(f, g)
+    if horizon_ms is None:
+        horizon_ms = min(f.horizon_ms, g.horizon_ms)
+    horizon_ms = float(horizon_ms)
+
+    # conmutativa: se recorren los escalones de la curva con menos puntos
+    if len(f) > len(g):
+        f, g = g, f
+    f, g = _clip(f, horizon_ms), _clip(g, horizon_ms)
+
+    # 1) s = t y s = 0: min(f, g)
+    times = _grid(f.breakpoints, g.breakpoints, horizon_ms)
+    env_t, env_v = _compress(times, np.minimum(f.at_many(times), g.at_many(times)))
+
+    # 2) s justo antes del final de cada escalón de f: level + g(t - end), para t >= end
+    g0 = g.at(0.0)
+    for end, level in zip(*(a.tolist() for a in _step_ends(f))):
+        threshold = level + g0
+        if threshold >= env_v[-1]:
+            # los niveles crecen: ninguna copia posterior baja la envolvente
+            break
+        start = max(env_t[int(np.searchsorted(env_v, threshold, side="right"))], end)
+
+        # la copia es constante entre sus puntos: baja la envolvente si algún
+        # escalón queda por debajo de la envolvente justo antes del siguiente
+        # (el último escalón llega hasta el horizonte incluido)
+        first = int(np.searchsorted(g.breakpoints, start - end, side="right"))
+        last = int(np.searchsorted(g.breakpoints, horizon_ms - end, side="right"))
+        copy_t = end + g.breakpoints[first:last]
+        steps = level + np.concatenate(([g.at(start - end)], g.values[first:last]))
+        before = env_v[np.searchsorted(env_t, copy_t, side="left") - 1]
+        if not (np.any(steps[:-1] < before) or steps[-1] < env_v[-1]):
+            continue
+
+        keep = int(np.searchsorted(env_t, start, side="left"))
+        times = np.union1d(np.union1d(env_t[keep:], copy_t), [start])
+        values = np.minimum(_at(env_t, env_v, times), level + g.at_many(times - end))
+
+        env_t, env_v = _compress(
+            np.concatenate((env_t[:keep], times)),
+            np.concatenate((env_v[:keep], values))
+        )
+
+    return CapacityCurve(env_t, env_v)
+
+
+def min_plus_deconvolution(
+    f: CapacityCurve,
+    g: CapacityCurve,
+    horizon_ms: Optional[float] = None
+) -> CapacityCurve:
+    """
+    Min-plus deconvolution (f ⊘ g)(t) = max over u >= 0 of f(t + u) - g(u).
+
+    f is only known up to the horizon, so u stops at horizon - t. The result is
+    the upper envelope of f, of f(horizon) - g(horizon - t) and of one copy of f
+    per step of g, shifted back to the end of the step and lowered by its level.
+    It is returned right-continuous, i.e. at a jump it takes the value just
+    after it, which never underestimates the exact result. Same cost as
+    min_plus_convolution.
+
+    Args:
+        f (CapacityCurve): Nondecreasing capacity curve, usually an arrival curve.
+        g (CapacityCurve): Nondecreasing capacity curve, usually a service curve.
+        horizon_ms (Optional[float]): Last instant of f to consider. Defaults to the end of f.
+
+    Returns:
+        CapacityCurve: The deconvolution up to the horizon, closed at the horizon.
+    """
+    _check_nondecreasing(f, g)
+    if horizon_ms is None:
+        horizon_ms = f.horizon_ms
+    horizon_ms = float(horizon_ms)
+    f, g = _clip(f, horizon_ms), _clip(g, horizon_ms)
+    f_end = f.at(horizon_ms)
+
+    # 1) u = 0 y u = horizonte - t (g justo antes de horizonte - t, por la continuidad por la derecha)
+    times = _grid(f.breakpoints, horizon_ms - g.breakpoints, horizon_ms)
+    idx = np.searchsorted(g.breakpoints, horizon_ms - times, side="left") - 1
+    g_before = np.where(idx >= 0, g.values[np.maximum(idx, 0)], 0.0) if len(g) else np.zeros(times.size)
+    env_t, env_v = _compress(times, np.maximum(f.at_many(times), f_end - g_before))
+
+    # 2) u justo antes del final de cada escalón de g: f(t + end) - level, para t <= horizonte - end
+    for end, level in zip(*(a.tolist() for a in _step_ends(g))):
+        bound = f_end - level
+        if bound <= env_v[0]:
+            # los niveles crecen: ninguna copia posterior sube la envolvente
+            break
+        stop = int(np.searchsorted(env_v, bound, side="left"))
+        last = horizon_ms - end
+        if stop < env_t.size:
+            last = min(last, env_t[stop])
+
+        copy_t = f.breakpoints - end
+        copy_t = copy_t[(copy_t >= 0) & (copy_t <= last)]
+        times = np.union1d(np.union1d(env_t[:stop], copy_t), [0.0])
+        times = times[times <= last]
+        values = np.maximum(_at(env_t, env_v, times), f.at_many(times + end) - level)
+
+        rest = int(np.searchsorted(env_t, times[-1], side="right"))
+        env_t, env_v = _compress(
+            np.concatenate((times, env_t[rest:])),
+            np.concatenate((values, env_v[rest:]))
+        )
+
+    return CapacityCurve(env_t, env_v)
+
+
+def vertical_deviation(
+    arrival: CapacityCurve,
+    service: ServiceCurve,
+    horizon_ms: Optional[float] = None
+) -> Tuple[float, float]:
+    """
+    Largest gap arrival(t) - service(t), the worst-case backlog.
+
+    The service curve is nondecreasing, so the gap is largest at a breakpoint of
+    the arrival curve; one vectorized evaluation of the service there is enough.
+
+    Args:
+        arrival (CapacityCurve): The accumulated demand.
+        service (ServiceCurve): The accumulated capacity of the plan.
+        horizon_ms (Optional[float]): Last instant to consider. Defaults to the end of the arrival curve.
+
+    Returns:
+        Tuple[float, float]: The backlog bound and the first instant it is reached (0 if there is no backlog).
+    """
+    times, demand = _arrival_points(arrival, horizon_ms)
+    gap = demand - service.at_many(times)
+    idx = int(np.argmax(gap))
+    if gap[idx] <= 0:
+        return 0.0, 0.0
+    return float(gap[idx]), float(times[idx])
+
+
+def horizontal_deviation(
+    arrival: CapacityCurve,
+    service: ServiceCurve,
+    horizon_ms: Optional[float] = None
+) -> Tuple[float, float]:
+    """
+    Longest time between a demanded request and the instant the plan can serve it,
+    the worst-case delay.
+
+    The arrival curve is constant between breakpoints, so the delay is largest at
+    a breakpoint: the first instant the service reaches arrival(t), minus t.
+
+    Args:
+        arrival (CapacityCurve): The accumulated demand.
+        service (ServiceCurve): The accumulated capacity of the plan. A
+            PeriodicCapacityCurve has no end, so every delay is finite.
+        horizon_ms (Optional[float]): Last instant of the arrival curve to consider.
+            Defaults to its end.
+
+    Returns:
+        Tuple[float, float]: The delay bound in milliseconds (inf if the service
+            never reaches the demand) and the instant of the requests that wait it.
+    """
+    times, demand = _arrival_points(arrival, horizon_ms)
+    delay = service.first_time_reaching_many(demand) - times
+    idx = int(np.argmax(delay))
+    if delay[idx] <= 0:
+        return 0.0, 0.0
+    return float(delay[idx]), float(times[idx])
+
+
+def service_bounds(
+    arrival: CapacityCurve,
+    service: ServiceCurve,
+    horizon_ms: Optional[float] = None
+) -> ServiceBounds:
+    """
+    Backlog and delay bounds of an arrival curve served by a service curve.
+
+    Args:
+        arrival (CapacityCurve): The accumulated demand.
+        service (ServiceCurve): The accumulated capacity of the plan.
+        horizon_ms (Optional[float]): Last instant of the arrival curve to consider.
+
+    Returns:
+        ServiceBounds: The vertical and horizontal deviations and when they happen.
+    """
+    backlog, backlog_time_ms = vertical_deviation(arrival, service, horizon_ms)
+    delay_ms, delay_time_ms = horizontal_deviation(arrival, service, horizon_ms)
+    return ServiceBounds(backlog, backlog_time_ms, delay_ms, delay_time_ms)
+
+
+def request_delays(
+    arrival: CapacityCurve,
+    service: ServiceCurve,
+    horizon_ms: Optional[float] = None
+) -> RequestDelays:
+    """
+    Delay of each request of a demand, pairing the k-th demanded request with the
+    k-th unit of plan capacity (first come, first served).
+
+    The k-th request is issued when the arrival curve first reaches k and served
+    when the service curve first reaches k, so every delay comes from two
+    vectorized inverse lookups: O(N log n) time. Requests are processed in blocks,
+    so memory is the float64 array of N delays plus one block of temporaries.
+
+    Args:
+        arrival (CapacityCurve): The accumulated demand.
+        service (ServiceCurve): The accumulated capacity of the plan.
+        horizon_ms (Optional[float]): Last instant of the arrival curve to consider.
+            Defaults to its end.
+
+    Returns:
+        RequestDelays: The delay of every request and its p50, p99 and maximum.
+    """
+    _, demand = _arrival_points(arrival, horizon_ms)
+    delays = np.empty(floor(float(demand.max(initial=0.0))))
+    if not delays.size:
+        return RequestDelays(delays, 0.0, 0.0, 0.0)
+
+    # 1) por bloques de peticiones, para que los temporales no crezcan con N
+    for start in range(0, delays.size, REQUEST_BLOCK):
+        ranks = np.arange(start + 1.0, min(start + REQUEST_BLOCK, delays.size) + 1.0)
+        block = delays[start:start + ranks.size]
+        np.subtract(service.first_time_reaching_many(ranks), arrival.first_time_reaching_many(ranks), out=block)
+        np.maximum(block, 0.0, out=block)
+
+    p50, p99 = (float(v) for v in np.percentile(delays, [50, 99], method="inverted_cdf"))
+    return RequestDelays(delays, p50, p99, float(delays.max()))
+
+
+def _check_nondecreasing(*curves: CapacityCurve) -> None:
+    for curve in curves:
+        if np.any(curve.values[1:] < curve.values[:-1]):
+            raise ValueError("min-plus operators need nondecreasing (accumulated) curves")
+
+
+def _clip(curve: CapacityCurve, horizon_ms: float) -> CapacityCurve:
+    return curve[:int(np.searchsorted(curve.breakpoints, horizon_ms, side="right"))]
+
+
+def _grid(a: np.ndarray, b: np.ndarray, horizon_ms: float) -> np.ndarray:
+    # Breakpoints of both curves inside [0, horizon], plus both ends
+    times = np.union1d(np.union1d(a, b), [0.0, horizon_ms])
+    return times[(times >= 0) & (times <= horizon_ms)]
+
+
+def _step_ends(curve: CapacityCurve) -> Tuple[np.ndarray, np.ndarray]:
+    # End and level of every step with a finite end, including the 0 step before
+    # the first breakpoint when the curve does not start at t = 0
+    if not len(curve):
+        return np.empty(0), np.empty(0)
+    if curve.breakpoints[0] > 0:
+        return curve.breakpoints, np.concatenate(([0.0], curve.values[:-1]))
+    return curve.breakpoints[1:], curve.values[:-1]
+
+
+def _at(times: np.ndarray, values: np.ndarray, t: np.ndarray) -> np.ndarray:
+    idx = np.searchsorted(times, t, side="right") - 1
+    return np.where(idx >= 0, values[np.maximum(idx, 0)], 0.0)
+
+
+def _compress(times: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Keeps the breakpoints where the value changes, plus the last one (the horizon)
+    keep = np.empty(values.size, dtype=bool)
+    keep[0] = keep[-1] = True
+    np.not_equal(values[1:-1], values[:-2], out=keep[1:-1])
+    return times[keep], values[keep]
+
+
+def _arrival_points(arrival: CapacityCurve, horizon_ms: Optional[float]) -> Tuple[np.ndarray, np.ndarray]:
+    if horizon_ms is not None:
+        arrival = _clip(arrival, horizon_ms)
+    if not len(arrival):
+        return np.zeros(1), np.zeros(1)
+    return arrival.breakpoints, arrival.values
@@ -1,9 +1,77 @@
-from typing import List, Optional, Union
+from collections.abc import Sequence
+from math import inf, isinf
+from typing import TYPE_CHECKING, List, Optional, Union
 from APICompass.ancillary.time_unit import TimeDuration, TimeUnit
 from APICompass.basic.bounded_rate import BoundedRate, Rate, Quota
+from APICompass.basic.backlog import BacklogResult, compute_backlog
+from APICompass.basic.feasibility import FeasibilityResult, check_feasibility, check_unbounded_feasibility, hyperperiod_ms
+from APICompass.basic.network_calculus import RequestDelays, ServiceBounds, ServiceCurve, request_delays, service_bounds
+from APICompass.basic.tandem import compose_in_series
+from APICompass.instrumentation import instrumented
 from APICompass.utils import parse_time_string_to_duration, select_best_time_unit
-from APICompass.basic.compare_curves import *
-import plotly.graph_objects as go
+import numpy as np
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+
+def __getattr__(name):
+    # Las utilidades de compare_curves (plotly/matplotlib) se cargan solo si se piden
+    if name.startswith("__"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from APICompass.basic import compare_curves
+    try:
+        return getattr(compare_curves, name)
+    except AttributeError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+
+class ScheduledRequests(Sequence):
+    """
+    Backlogged requests rescheduled by has_enough_capacity, one every plan period
+    from the first instant, with ids from 2. Items are {"id": int, "scheduled_at": float}
+    dicts, as in the list it replaces, but each one is built on access, so a backlog
+    of millions of requests costs no memory.
+    """
+
+    __slots__ = ("_count", "_period_ms", "_output_time_unit")
+
+    def __init__(self, count: int, period_ms: float, output_time_unit: TimeUnit):
+        self._count = count
+        self._period_ms = period_ms
+        self._output_time_unit = output_time_unit
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("scheduled request index out of range")
+        t_ms = (index + 1) * self._period_ms
+        t = TimeDuration(t_ms, TimeUnit.MILLISECOND).to_desired_time_unit(self._output_time_unit).value
+        return {"id": index + 2, "scheduled_at": t}
+
+    def __eq__(self, other):
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self):
+        return f"ScheduledRequests({self._count} requests, every {self._period_ms} ms)"
+
+    def times_ms(self) -> np.ndarray:
+        """
+        Instants of all the rescheduled requests in one array.
+
+        Returns:
+            np.ndarray: The instants in milliseconds, ascending.
+        """
+        return np.arange(1, self._count + 1, dtype=np.float64) * self._period_ms
+
 
 class Plan():
     def __init__(self, name, bounded_rate: BoundedRate, cost, overage_cost, max_number_of_subscriptions, billing_period):
@@ -37,12 +105,36 @@ class Plan():
     def min_time(self, capacity_goal):
         return self.bounded_rate.min_time(capacity_goal)
 
+    def in_series(self, *bounded_rates: BoundedRate, verify: bool = False) -> "Plan":
+        """
+        This plan reached through other limiters (an own gateway, a proxy), as one plan
+        whose bounded rate is the end-to-end capacity of all of them.
+
+        Args:
+            *bounded_rates (BoundedRate): The limiters in front of the plan.
+            verify (bool): Check the composition against the exact convolution, see compose_in_series.
+
+        Returns:
+            Plan: A copy of this plan with the composed bounded rate.
+
+        Raises:
+            ValueError: If the limiters and the plan in series are not a stack of limits.
+        """
+        plan = Plan(
+            self.name, compose_in_series([*bounded_rates, self.bounded_rate], verify=verify), self.cost,
+            self.overage_cost, self.max_number_of_subscriptions, self.billing_period
+        )
+        plan.max_included_quota = self.max_included_quota
+        return plan
+
+    @instrumented
     def show_capacity(self, time_interval: Union[str, TimeDuration], return_fig=False):
         if isinstance(time_interval, str):
             time_interval = parse_time_string_to_duration(time_interval)
         
         return self.bounded_rate.show_capacity(time_interval, return_fig=return_fig)
 
+    @instrumented
     def consume(self, demand: 'Demand', time_interval: Union[str, TimeDuration],return_fig=False):
         """
         Consumes demand over a specified time interval, comparing bounded rates.
@@ -54,6 +146,8 @@ class Plan():
         if isinstance(time_interval, str):
             time_interval = parse_time_string_to_duration(time_interval)
 
+        from APICompass.basic.compare_curves import compare_bounded_rates_capacity
+
         # Compare the bounded rates of the plan and the demand
         fig = compare_bounded_rates_capacity(
             bounded_rates=[self.bounded_rate, demand.bounded_rate],
@@ -64,6 +158,7 @@ class Plan():
         if return_fig:
             return fig
     
+    @instrumented
     def compare_demands(self, demands: List['Demand'], time_interval: Optional[Union[str, TimeDuration]] = None, return_fig=False):
         """
         Compares multiple demands over a specified time interval.
@@ -89,6 +184,8 @@ class Plan():
         elif isinstance(time_interval, str):
             time_interval = parse_time_string_to_duration(time_interval)
 
+        from APICompass.basic.compare_curves import compare_bounded_rates_capacity
+
         # Compare the bounded rates of the plan and the demand
         fig = compare_bounded_rates_capacity(
             bounded_rates=[self.bounded_rate] + [demand.bounded_rate for demand in demands],
@@ -99,45 +196,185 @@ class Plan():
         if return_fig:
             return fig
     
-    def has_enough_capacity_for_constant_rate(
+    @instrumented
+    def backlog(self, demand: 'Demand', time_interval: Union[str, TimeDuration]) -> BacklogResult:
+        """
+        Computes the backlog of a demand served by this plan over a time interval.
+
+        Args:
+            demand (Demand): The demand to serve.
+            time_interval (Union[str, TimeDuration]): The time interval to analyze.
+
+        Returns:
+            BacklogResult: The maximum backlog, when it happens and the backlog curve.
+        """
+        if isinstance(time_interval, str):
+            time_interval = parse_time_string_to_duration(time_interval)
+
+        plan_curve = self.bounded_rate.show_available_capacity_curve(time_interval, debug=True)
+        demand_curve = demand.bounded_rate.show_available_capacity_curve(time_interval, debug=True)
+        return compute_backlog(plan_curve, demand_curve, time_interval.to_milliseconds())
+
+    def _keeps_up_with(self, demand: 'Demand') -> bool:
+        # Long-run rate of each: units of the outermost limit per period
+        plan_stack, demand_stack = self.bounded_rate.limit_stack, demand.bounded_rate.limit_stack
+        return demand_stack.top_units / demand_stack.top_period_ms <= plan_stack.top_units / plan_stack.top_period_ms
+
+    def _analysis_horizon_ms(self, demand: 'Demand') -> float:
+        # If the plan keeps up in the long run the backlog repeats every
+        # hyperperiod, and a demand that stops earlier can only lose backlog
+        horizon_ms = hyperperiod_ms(
+            self.bounded_rate.limit_stack.top_period_ms,
+            demand.bounded_rate.limit_stack.top_period_ms
+        )
+        if demand.bounded_rate.max_active_time is not None:
+            horizon_ms = min(horizon_ms, demand.bounded_rate.max_active_time.to_milliseconds())
+        return horizon_ms
+
+    @instrumented
+    def service_bounds(
         self,
         demand: 'Demand',
         time_interval: Union[str, TimeDuration, None] = None
-    ) -> None:
+    ) -> ServiceBounds:
         """
-        Check if this plan can serve a constant‐rate demand over the demand's duration.
-        Prints Yes or No and the first point of failure (if any).
+        Exact worst-case backlog and delay of a demand served by this plan, as the
+        vertical and horizontal deviations between the demand (arrival) curve and
+        the plan (service) curve.
+
+        Args:
+            demand (Demand): The demand to serve.
+            time_interval (Union[str, TimeDuration, None]): The time interval of the demand
+                to analyze. Defaults to the hyperperiod of both, cut at the demand's
+                max_active_time. If the demand outpaces the plan in the long run it
+                defaults to the whole demand, and the bounds are inf if the demand
+                never stops.
+
+        Returns:
+            ServiceBounds: The backlog and delay bounds and when they happen.
+        """
+        if time_interval is None:
+            if self._keeps_up_with(demand):
+                time_interval = select_best_time_unit(self._analysis_horizon_ms(demand))
+            elif demand.bounded_rate.max_active_time is not None:
+                time_interval = demand.bounded_rate.max_active_time
+            else:
+                return ServiceBounds(inf, inf, inf, inf)
+        elif isinstance(time_interval, str):
+            time_interval = parse_time_string_to_duration(time_interval)
+
+        arrival = demand.bounded_rate.show_available_capacity_curve(time_interval, debug=True)
+        return service_bounds(arrival, self._service_curve())
+
+    @instrumented
+    def request_delays(
+        self,
+        demand: 'Demand',
+        time_interval: Union[str, TimeDuration, None] = None
+    ) -> RequestDelays:
+        """
+        Wait of every request of a demand served in order by this plan, with its
+        p50, p99 and maximum, e.g. to choose client-side timeouts.
+
+        Args:
+            demand (Demand): The demand to serve.
+            time_interval (Union[str, TimeDuration, None]): The time interval of the demand
+                to analyze. Defaults to the demand's max_active_time or, for a demand
+                that never stops, to the hyperperiod of both.
+
+        Returns:
+            RequestDelays: The delay of every request, in milliseconds.
         """
-        # 1) Si no viene intervalo, usamos la duración de la demanda
         if time_interval is None:
             time_interval = demand.bounded_rate.max_active_time
             if time_interval is None:
-                raise ValueError("Demand has no max_active_time; please supply time_interval.")
+                if not self._keeps_up_with(demand):
+                    raise ValueError(
+                        "The demand never stops and outpaces the plan, so its delays grow "
+                        "without bound. Pass a time_interval."
+                    )
+                time_interval = select_best_time_unit(self._analysis_horizon_ms(demand))
         elif isinstance(time_interval, str):
             time_interval = parse_time_string_to_duration(time_interval)
 
-        # 2) Extraemos curvas debug [(t_ms, cap), ...]
-        plan_pts = self.bounded_rate.show_available_capacity_curve(time_interval, debug=True)
-        dem_pts  = demand.bounded_rate.show_available_capacity_curve(time_interval, debug=True)
+        arrival = demand.bounded_rate.show_available_capacity_curve(time_interval, debug=True)
+        return request_delays(arrival, self._service_curve())
 
-        unit_ms = time_interval.unit.to_milliseconds()
+    def _service_curve(self) -> ServiceCurve:
+        # Sin max_active_time el plan no se acaba y todos los retardos son finitos
+        if self.bounded_rate.max_active_time is None:
+            return self.bounded_rate.periodic_curve
+        return self.bounded_rate.show_available_capacity_curve(self.bounded_rate.max_active_time, debug=True)
 
-        # 3) Recorremos punto a punto
-        for (t_ms, cap_plan), (_, cap_dem) in zip(plan_pts, dem_pts):
-            t_val = t_ms / unit_ms
-            if cap_dem > cap_plan:
-                print(
-                    f"No: at t={t_val:.2f}{time_interval.unit.value}, "
-                    f"plan={cap_plan}, demand={cap_dem}"
-                )
-                return
+    @instrumented
+    def check_feasibility(
+        self,
+        demand: 'Demand',
+        time_interval: Union[str, TimeDuration, None] = None
+    ) -> FeasibilityResult:
+        """
+        Checks, without sampling, whether this plan can serve a demand over a time interval.
 
-        # 4) Si nunca falla
+        Args:
+            demand (Demand): The demand to serve.
+            time_interval (Union[str, TimeDuration, None]): The time interval to check.
+                Defaults to the demand's max_active_time. If neither is set, the
+                demand is checked for every instant using the hyperperiod of both.
+
+        Returns:
+            FeasibilityResult: The feasibility flag and, if any, the first violation
+                instant, the deficit and the plan limit responsible for it.
+        """
+        # 1) Si no viene intervalo, usamos la duración de la demanda (o la del plan)
+        if time_interval is None:
+            time_interval = demand.bounded_rate.max_active_time or self.bounded_rate.max_active_time
+            if time_interval is None:
+                return check_unbounded_feasibility(self.bounded_rate.limit_stack, demand.bounded_rate.periodic_curve)
+        elif isinstance(time_interval, str):
+            time_interval = parse_time_string_to_duration(time_interval)
+
+        # 2) Solo se comprueba mientras ambos están activos
+        horizon_ms = min(
+            demand.bounded_rate._effective_time(time_interval).to_milliseconds(),
+            self.bounded_rate._effective_time(time_interval).to_milliseconds()
+        )
+        return check_feasibility(self.bounded_rate.limit_stack, demand.bounded_rate.periodic_curve, horizon_ms)
+
+    def has_enough_capacity_for_constant_rate(
+        self,
+        demand: 'Demand',
+        time_interval: Union[str, TimeDuration, None] = None
+    ) -> None:
+        """
+        Check if this plan can serve a constant‐rate demand over the demand's duration.
+        Prints Yes or No and the first point of failure (if any).
+        """
+        if isinstance(time_interval, str):
+            time_interval = parse_time_string_to_duration(time_interval)
+        result = self.check_feasibility(demand, time_interval)
+
+        if time_interval is None:
+            time_interval = demand.bounded_rate.max_active_time or self.bounded_rate.max_active_time
+
+        if not result.feasible:
+            if time_interval is None:
+                time_interval = select_best_time_unit(result.violation_time_ms)
+            t_val = result.violation_time_ms / time_interval.unit.to_milliseconds()
+            print(
+                f"No: at t={t_val:.2f}{time_interval.unit.value}, "
+                f"plan={result.plan_capacity}, demand={result.demand_capacity}"
+            )
+            return
+
+        if time_interval is None:
+            print("Yes: plan covers demand indefinitely.")
+            return
         print(
             f"Yes: plan covers demand up to "
             f"{time_interval.value}{time_interval.unit.value}."
         )
     
+    @instrumented
     def has_enough_capacity(
         self,
         demand: 'Demand',
@@ -150,11 +387,16 @@ class Plan():
         - demand_rate (str)
         - v_plan (float): plan speed in req/ms
         - v_demand (float): demand speed in req/ms
-        - max_backlog (int)
+        - max_backlog (int): exact worst-case backlog
+        - delay_bound (float, in output_time_unit): exact worst-case wait of a request
         - drain_time (float, in output_time_unit)
-        - scheduled_requests (List[{"id": int, "scheduled_at": float}])
+        - scheduled_requests (ScheduledRequests of {"id": int, "scheduled_at": float})
         - resume_plan_rate (str)
         - resume_in (float, in output_time_unit)
+
+        The bounds cover the horizon of service_bounds. If the demand outpaces the
+        plan in the long run and never stops, or some request is never served,
+        can_cover is False with an inf max_backlog and delay_bound.
         """
         # 0) Instantaneous rate check
         plan_rate = self.bounded_rate.rate
@@ -214,33 +456,25 @@ class Plan():
                             "quota_allowed_in_plan_window": q_p.consumption_unit
                         }
 
-        # 2) Horizon and sampling
-        plan_q_ms = plan_quotas[0].consumption_period.to_milliseconds() if plan_quotas else 0
-        demand_q_ms = demand_quotas[-1].consumption_period.to_milliseconds() if demand_quotas else 0
-        horizon_ms = max(plan_q_ms, demand_q_ms)
-        td = select_best_time_unit(horizon_ms)
-        step_ms = plan_rate.consumption_period.to_milliseconds()
-        times = list(range(0, int(td.to_milliseconds()) + 1, int(step_ms)))
-        if times[-1] != td.to_milliseconds():
-            times.append(int(td.to_milliseconds()))
-
-        plan_pts = self.bounded_rate.show_available_capacity_curve(td, debug=True)
-        demand_pts = demand.bounded_rate.show_available_capacity_curve(td, debug=True)
-
-        def value_at(ts, pts):
-            last = 0
-            for t, c in pts:
-                if t > ts:
-                    break
-                last = c
-            return last
-
-        # 3) Compute backlog
-        max_backlog = 0
-        for t in times:
-            back = value_at(t, demand_pts) - value_at(t, plan_pts)
-            if back > max_backlog:
-                max_backlog = back
+        # 2) Exact backlog and delay bounds (vertical and horizontal deviations), over
+        #    service_bounds' own horizon: one hyperperiod if the plan keeps up, the
+        #    whole demand otherwise, and inf if the demand outpaces it and never stops
+        bounds = self.service_bounds(demand)
+        if isinf(bounds.backlog) or isinf(bounds.delay_ms):
+            return {
+                "can_cover": False,
+                "plan_rate": f"{plan_rate.consumption_unit}/{plan_rate.consumption_period}",
+                "demand_rate": f"{d_rate.consumption_unit}/{d_rate.consumption_period}",
+                "v_plan": round(v_plan, 6),
+                "v_demand": round(v_dem, 6),
+                "reason": "long_run_rate_exceeded",
+                "max_backlog": inf,
+                "delay_bound": inf
+            }
+
+        max_backlog = bounds.backlog
+        delay_bound = TimeDuration(bounds.delay_ms, TimeUnit.MILLISECOND)\
+                        .to_desired_time_unit(output_time_unit).value
 
         if max_backlog <= 0:
             return {
@@ -250,27 +484,21 @@ class Plan():
                 "v_plan": round(v_plan, 6),
                 "v_demand": round(v_dem, 6),
                 "max_backlog": 0,
-                "scheduled_requests": [],
+                "delay_bound": delay_bound,
+                "scheduled_requests": ScheduledRequests(0, 1 / v_plan, output_time_unit),
                 "resume_plan_rate": f"{plan_rate.consumption_unit}/{plan_rate.consumption_period}",
                 "resume_in": 0.0
             }
 
-        # 4) Drain backlog
+        # 3) Drain backlog
         r_p = v_plan
         periodo_ms = 1 / r_p
         t_drain_ms = max_backlog / r_p
 
-        # 5) Schedule requests
-        scheduled = []
-        first_id = 2
-        for i in range(int(max_backlog)):
-            pid = first_id + i
-            t_i_ms = (i + 1) * periodo_ms
-            t_i = TimeDuration(t_i_ms, TimeUnit.MILLISECOND)\
-                    .to_desired_time_unit(output_time_unit).value
-            scheduled.append({"id": pid, "scheduled_at": t_i})
-
-        # 6) Resume windows
+        # 4) Schedule requests, one every plan period (built on access)
+        scheduled = ScheduledRequests(int(max_backlog), periodo_ms, output_time_unit)
+
+        # 5) Resume windows
         dp_ms = d_rate.consumption_period.to_milliseconds()
         rem_ms = dp_ms - (t_drain_ms % dp_ms)
         if rem_ms >= dp_ms:
@@ -285,6 +513,7 @@ class Plan():
             "v_plan": round(v_plan, 6),
             "v_demand": round(v_dem, 6),
             "max_backlog": int(max_backlog),
+            "delay_bound": delay_bound,
             "drain_time": TimeDuration(t_drain_ms, TimeUnit.MILLISECOND)
                         .to_desired_time_unit(output_time_unit).value,
             "scheduled_requests": scheduled,
@@ -293,6 +522,7 @@ class Plan():
         }
 
         
+    @instrumented
     def info_has_enough_capacity(
         self,
         demand: 'Demand',
@@ -336,6 +566,10 @@ class Plan():
 
         print(f"→ Max backlog: {max_backlog if max_backlog is not None else 'N/A'} requests")
 
+        delay_bound = analysis.get("delay_bound")
+        if delay_bound is not None:
+            print(f"→ Worst-case delay: {delay_bound:.2f} {output_time_unit.value}")
+
         if drain_time is not None:
             print(f"→ Time to drain backlog: {drain_time:.2f} {output_time_unit.value}")
         else:
@@ -366,12 +600,13 @@ class Plan():
 
         
     
+    @instrumented
     def plot_rescheduled_capacity(
         self,
         demand: 'Demand',
         time_interval: Union[str, TimeDuration],
         output_time_unit: TimeUnit = TimeUnit.SECOND
-    ) -> go.Figure:
+    ) -> "go.Figure":
         """
         Generates and returns a Plotly figure showing:
         - Plan capacity curve
@@ -383,49 +618,40 @@ class Plan():
             time_interval = parse_time_string_to_duration(time_interval)
         td = select_best_time_unit(time_interval.to_milliseconds())
         
-        # Sampled curves (debug)
-        plan_pts = self.bounded_rate.show_available_capacity_curve(td, debug=True)
-        demand_pts = demand.bounded_rate.show_available_capacity_curve(td, debug=True)
-        
-        times_ms = [t for t, _ in plan_pts]
-        plan_caps = [c for _, c in plan_pts]
-        demand_caps = [c for _, c in demand_pts]
+        # Breakpoint curves (debug), evaluated on the union of both grids
+        plan_curve = self.bounded_rate.show_available_capacity_curve(td, debug=True)
+        demand_curve = demand.bounded_rate.show_available_capacity_curve(td, debug=True)
+
+        end_ms = min(plan_curve.horizon_ms, demand_curve.horizon_ms)
+        times = np.union1d(plan_curve.breakpoints, demand_curve.breakpoints)
+        times = times[times <= end_ms]
+
+        plan_caps = plan_curve.at_many(times)
+        demand_caps = demand_curve.at_many(times)
         
         # Analyze capacity to get scheduled requests
         analysis = self.has_enough_capacity(demand, output_time_unit)
-        scheduled = analysis.get("scheduled_requests", [])
+        scheduled = analysis.get("scheduled_requests")
         
-        # Build rescheduled demand
-        demand_resched = []
-        cum = 0
-        sched_iter = iter(scheduled)
-        next_sched = next(sched_iter, None)
-        for t_ms, orig_c in zip(times_ms, demand_caps):
-            if t_ms == 0:
-                cum = orig_c
-            while next_sched and next_sched["scheduled_at"] * 1000 <= t_ms:
-                cum += 1
-                next_sched = next(sched_iter, None)
-            demand_resched.append(cum)
+        # Build rescheduled demand: the demand at t=0 plus the requests scheduled up to each instant
+        scheduled_ms = scheduled.times_ms() if scheduled else np.empty(0)
+        start = demand_caps[0] if times.size and times[0] == 0 else 0.0
+        demand_resched = start + np.searchsorted(scheduled_ms, times, side="right")
         
         # Convert times to output unit for axis
         factor = output_time_unit.to_milliseconds(1)
-        xs = [t / factor for t in times_ms]
+        xs = times / factor
         
         # Create figure
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=xs, y=plan_caps, mode="lines", name="Plan Capacity",
-            line=dict(color="green", shape="hv")
-        ))
-        fig.add_trace(go.Scatter(
-            x=xs, y=demand_caps, mode="lines", name="Original Demand",
-            line=dict(color="blue", dash="dash", shape="hv")
-        ))
-        fig.add_trace(go.Scatter(
-            x=xs, y=demand_resched, mode="lines", name="Rescheduled Demand",
-            line=dict(color="red", shape="hv")
-        ))
+        from APICompass.ancillary.figure_builder import build_figure, trace
+        fig = build_figure([
+            trace(xs, plan_caps, mode="lines", name="Plan Capacity",
+                  line=dict(color="green", shape="hv")),
+            trace(xs, demand_caps, mode="lines", name="Original Demand",
+                  line=dict(color="blue", dash="dash", shape="hv")),
+            trace(xs, demand_resched, mode="lines", name="Rescheduled Demand",
+                  line=dict(color="red", shape="hv")),
+        ])
 
         fig.update_layout(
             title="Capacity vs. Rescheduled Demand",
@@ -515,6 +741,7 @@ class Demand():
 
 # Example usage
 if __name__ == "__main__":
+    from APICompass.basic.compare_curves import update_legend, update_title, update_yaxis
 
     # Create a BoundedRate instance for testing
     plan_limits = BoundedRate(Rate(1, "2s"), Quota(1500, "1h"))
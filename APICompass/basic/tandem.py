@@ -0,0 +1,149 @@
+"""
+Bounded rates in series.
+
+A request crosses several limiters one after another (an own gateway, a proxy,
+the vendor plan) and the end-to-end service curve is the min-plus convolution
+of their capacity curves. When the result is itself a stack of limits, it is
+returned as one BoundedRate, so plans, demands and the compare functions use
+it like any other and its capacity is compiled once.
+"""
+from fractions import Fraction
+from functools import reduce
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from APICompass.ancillary.time_unit import TimeDuration, TimeUnit
+from APICompass.basic.bounded_rate import BoundedRate, Quota, Rate
+from APICompass.basic.capacity_curve import CapacityCurve
+from APICompass.basic.feasibility import hyperperiod_ms
+from APICompass.basic.network_calculus import min_plus_convolution
+from APICompass.utils import parse_time_string_to_duration
+
+# Hiperperiodos sobre los que compose_in_series comprueba la composición
+CHECKED_HYPERPERIODS = 2
+
+
+def tandem_service_curve(
+    bounded_rates: Sequence[BoundedRate],
+    time_interval: Union[str, TimeDuration]
+) -> CapacityCurve:
+    """
+    Exact end-to-end capacity curve of bounded rates in series, for any periods.
+
+    Args:
+        bounded_rates (Sequence[BoundedRate]): The stages, in any order (the convolution is commutative).
+        time_interval (Union[str, TimeDuration]): The horizon of the curve.
+
+    Returns:
+        CapacityCurve: The min-plus convolution of the capacity curves of the stages.
+    """
+    if not bounded_rates:
+        raise ValueError("at least one bounded rate is required")
+    if isinstance(time_interval, str):
+        time_interval = parse_time_string_to_duration(time_interval)
+
+    horizon_ms = time_interval.to_milliseconds()
+    curves = [br.show_available_capacity_curve(time_interval, debug=True) for br in bounded_rates]
+    return reduce(lambda f, g: min_plus_convolution(f, g, horizon_ms), curves)
+
+
+def compose_in_series(bounded_rates: Sequence[BoundedRate], verify: bool = False) -> BoundedRate:
+    """
+    One BoundedRate with the end-to-end capacity of bounded rates in series.
+
+    The limits of every stage are merged by period, keeping the tightest units of
+    each period, dropping shorter limits that are not tighter than a longer one and
+    longer limits that the shorter one before them never lets through; the result
+    is active while every stage is. It is decided from the limits alone: when every
+    period divides the next one and no stage carries such an unreachable limit,
+    fixed windows of all stages restart together and the merged stack is exactly
+    the min-plus convolution of the stages. Otherwise the stages can interleave
+    their windows so that the tandem serves less than any stack of limits.
+
+    Args:
+        bounded_rates (Sequence[BoundedRate]): The stages, in any order.
+        verify (bool): Check the result against the exact convolution over
+            CHECKED_HYPERPERIODS hyperperiods (O(n * m), see min_plus_convolution)
+            instead of trusting the structure. Stages whose periods do not divide
+            each other are only composed this way.
+
+    Returns:
+        BoundedRate: The composed bounded rate.
+
+    Raises:
+        ValueError: If there are no stages, or if their tandem is not (or, without
+            verify, cannot be shown to be) a stack of limits.
+    """
+    if not bounded_rates:
+        raise ValueError("at least one bounded rate is required")
+    if len(set(bounded_rates)) == 1:
+        return bounded_rates[0]
+
+    # 1) unidades más estrictas de cada periodo, de todas las etapas
+    tightest: Dict[float, Union[Rate, Quota]] = {}
+    for br in bounded_rates:
+        for limit in br.limits:
+            period_ms = limit.consumption_period.to_milliseconds()
+            if period_ms not in tightest or limit.consumption_unit < tightest[period_ms].consumption_unit:
+                tightest[period_ms] = limit
+
+    # 2) de dentro hacia fuera: un límite más corto sobra si no es más estricto, y
+    #    uno más largo si el anterior no deja pasar sus unidades en su periodo
+    kept: List[Union[Rate, Quota]] = []
+    for period_ms in sorted(tightest):
+        limit = tightest[period_ms]
+        while kept and kept[-1].consumption_unit >= limit.consumption_unit:
+            kept.pop()
+        if kept and limit.consumption_unit >= _units_through(kept[-1], limit.period_ms):
+            continue
+        kept.append(limit)
+
+    max_active_time: Optional[TimeDuration] = min(
+        (br.max_active_time for br in bounded_rates if br.max_active_time is not None),
+        key=lambda d: d.to_milliseconds(), default=None
+    )
+
+    rate = kept[0] if isinstance(kept[0], Rate) else Rate(kept[0].consumption_unit, kept[0].consumption_period)
+    quotas = [q if isinstance(q, Quota) else Quota(q.consumption_unit, q.consumption_period) for q in kept[1:]]
+    composed = BoundedRate(rate, quotas, max_active_time)
+
+    # 3) decisión estructural: periodos anidados y ninguna etapa con límites inalcanzables
+    periods_ms = sorted(tightest)
+    nested = all(_divides(inner, outer) for inner, outer in zip(periods_ms, periods_ms[1:])) and all(
+        outer.consumption_unit <= _units_through(inner, outer.period_ms)
+        for br in bounded_rates for inner, outer in zip(br.limits, br.limits[1:])
+    )
+    if not verify:
+        if not nested:
+            raise ValueError(
+                f"the bounded rates {', '.join(map(repr, bounded_rates))} in series do not have nested periods; "
+                "pass verify=True to check them against the exact convolution, or use tandem_service_curve"
+            )
+        return composed
+
+    # 4) comprobación exacta frente a la convolución
+    horizon_ms = CHECKED_HYPERPERIODS * hyperperiod_ms(*(br.limit_stack.top_period_ms for br in bounded_rates))
+    if max_active_time is not None:
+        horizon_ms = min(horizon_ms, max_active_time.to_milliseconds())
+    horizon = TimeDuration(horizon_ms, TimeUnit.MILLISECOND)
+    tandem = tandem_service_curve(bounded_rates, horizon)
+    merged = composed.show_available_capacity_curve(horizon, debug=True)
+    t_ms = np.union1d(tandem.breakpoints, merged.breakpoints)
+    t_ms = t_ms[t_ms <= horizon_ms]
+    if not np.array_equal(tandem.at_many(t_ms), merged.at_many(t_ms)):
+        raise ValueError(
+            f"the bounded rates {', '.join(map(repr, bounded_rates))} in series are not a stack of limits; "
+            "use tandem_service_curve for their exact capacity"
+        )
+    return composed
+
+
+def _units_through(inner: Union[Rate, Quota], period_ms: float) -> float:
+    # Lo que inner deja pasar, como mucho, en period_ms (múltiplo de su periodo)
+    return inner.consumption_unit * period_ms / inner.period_ms
+
+
+def _divides(inner_ms: float, outer_ms: float) -> bool:
+    ratio = Fraction(outer_ms).limit_denominator(10**6) / Fraction(inner_ms).limit_denominator(10**6)
+    return ratio.denominator == 1
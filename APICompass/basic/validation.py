@@ -0,0 +1,99 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Tuple
+
+from APICompass.basic.limit_stack import capacity_at
+
+if TYPE_CHECKING:
+    from APICompass.basic.bounded_rate import Quota, Rate
+
+# Motivos por los que se omite una cuota
+NOT_ABOVE_RATE = "not_above_rate"
+EXCEEDS_RATE_CAPACITY = "exceeds_rate_capacity"
+UNREACHABLE = "unreachable"
+
+
+@dataclass(frozen=True)
+class OmittedQuota:
+    """
+    A quota left out of a BoundedRate, with the reason why.
+
+    reason is one of NOT_ABOVE_RATE (it allows no more units than the rate),
+    EXCEEDS_RATE_CAPACITY (the rate alone cannot deliver its units within its
+    period) or UNREACHABLE (the limits accepted before it cannot deliver its units
+    within its period).
+    """
+    quota: "Quota"
+    reason: str
+    max_capacity: float
+
+
+@dataclass(frozen=True)
+class QuotaValidationReport:
+    """
+    Outcome of validating the quotas of a BoundedRate: the quotas kept, in order,
+    and the ones omitted.
+    """
+    accepted: Tuple["Quota", ...] = ()
+    omitted: Tuple[OmittedQuota, ...] = ()
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.omitted
+
+
+class QuotaValidator:
+    """
+    Validates the quotas of a rate one at a time.
+
+    The units and millisecond periods of the accepted limits are kept as the
+    running state, so checking whether a new quota is reachable is a single walk
+    over the limits accepted so far, with no intermediate objects.
+    """
+
+    def __init__(self, rate: "Rate"):
+        self.rate = rate
+        self._units: List[float] = [rate.consumption_unit]
+        self._periods_ms: List[float] = [rate.period_ms]
+        self._accepted: List["Quota"] = []
+        self._omitted: List[OmittedQuota] = []
+
+    def add(self, quota: "Quota") -> bool:
+        """
+        Validates a quota against the limits accepted so far and keeps it if valid.
+
+        Args:
+            quota (Quota): The quota to validate.
+
+        Returns:
+            bool: True if the quota was accepted.
+        """
+        rate_units, rate_period_ms = self._units[0], self._periods_ms[0]
+        q_units, q_period_ms = quota.consumption_unit, quota.period_ms
+
+        # 1) validación rápida: mayor que la rate y alcanzable por la rate sola
+        if q_units <= rate_units:
+            return self._omit(quota, NOT_ABOVE_RATE, rate_units)
+        rate_capacity = rate_units * (q_period_ms / rate_period_ms)
+        if q_units > rate_capacity:
+            return self._omit(quota, EXCEEDS_RATE_CAPACITY, rate_capacity)
+
+        # 2) capacidad de los límites ya aceptados al final de la ventana de la cuota
+        capacity = capacity_at(self._units, self._periods_ms, q_period_ms)
+        if capacity < q_units:
+            return self._omit(quota, UNREACHABLE, capacity)
+
+        self._units.append(q_units)
+        self._periods_ms.append(q_period_ms)
+        self._accepted.append(quota)
+        return True
+
+    def report(self) -> QuotaValidationReport:
+        """
+        Returns:
+            QuotaValidationReport: The accepted and omitted quotas so far.
+        """
+        return QuotaValidationReport(tuple(self._accepted), tuple(self._omitted))
+
+    def _omit(self, quota: "Quota", reason: str, max_capacity: float) -> bool:
+        self._omitted.append(OmittedQuota(quota, reason, max_capacity))
+        return False
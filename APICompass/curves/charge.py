@@ -1,20 +1,59 @@
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
 from APICompass.ancillary.time_unit import TimeDuration
 from APICompass.basic.bounded_rate import BoundedRate, Quota, Rate
 from APICompass.basic.plan_and_demand import Plan
-from APICompass.utils import parse_time_string_to_duration
-import sympy as sp
+from APICompass.instrumentation import instrumented
+from APICompass.utils import select_best_time_unit
+
+
+def line_intersection(
+    p1: Tuple[float, float], p2: Tuple[float, float],
+    q1: Tuple[float, float], q2: Tuple[float, float]
+) -> Optional[Tuple[float, float]]:
+    """
+    Punto de corte de la recta que pasa por p1 y p2 con la que pasa por q1 y q2.
+
+    Args:
+        p1, p2 (Tuple[float, float]): Dos puntos de la primera recta.
+        q1, q2 (Tuple[float, float]): Dos puntos de la segunda recta.
+
+    Returns:
+        Optional[Tuple[float, float]]: El punto de corte, o None si son paralelas o coinciden.
+    """
+    m1 = (p2[1] - p1[1]) / (p2[0] - p1[0])
+    m2 = (q2[1] - q1[1]) / (q2[0] - q1[0])
+    if m1 == m2:
+        return None
+
+    # m1 (x - x1) + y1 = m2 (x - x3) + y3
+    x = (m1 * p1[0] - p1[1] - m2 * q1[0] + q1[1]) / (m1 - m2)
+    return x, m1 * (x - p1[0]) + p1[1]
 
 
-def generate_points_for_curves(plan: Plan):
-    threshold_str = plan.quota_exhaustion_thresholds()
-    threshold_td = parse_time_string_to_duration(threshold_str)
+@instrumented
+def generate_points_for_curves(plan: Plan, quota_index: int = 0):
+    # solo las cuotas alcanzables tienen umbral; las omitidas se nombran en el error
+    quotas = plan.bounded_rate.quota
+    if not -len(quotas) <= quota_index < len(quotas):
+        omitted = plan.bounded_rate.validation_report.omitted
+        detail = "; omitted: " + ", ".join(f"{o.quota} ({o.reason})" for o in omitted) if omitted else ""
+        raise ValueError(
+            f"Plan '{plan.name}' has no quota {quota_index}: it has {len(quotas)} reachable "
+            f"quota(s){detail}."
+        )
+
+    # t* de la cuota, ya en ms en la pila compilada (sin pasar por cadenas)
+    threshold_ms = plan.bounded_rate.limit_stack.exhaustion_thresholds_ms[quota_index]
+    threshold_td = select_best_time_unit(float(threshold_ms))
     exhaustion_threshold_s = threshold_td.to_seconds()
  
     rate_value = plan.bounded_rate.rate.consumption_unit
  
-    quota_obj = plan.bounded_rate.quota[0]
+    quota_obj = plan.bounded_rate.quota[quota_index]
     quota_value = quota_obj.consumption_unit
     quota_period_s = quota_obj.consumption_period.to_seconds()
     quota_period = quota_obj.consumption_period
@@ -72,21 +111,10 @@ def generate_points_for_curves(plan: Plan):
             ((quota_period_s - exhaustion_threshold_s)/quota_period_s, 1.0)
         )
     else:
-        # Caso normal: corte único
-        x = sp.Symbol('x')
- 
-        # Azul: tramo inicial
-        (xa1, ya1), (xa2, ya2) = carga_norm[0], carga_norm[1]
-        f_azul = (ya2 - ya1) / (xa2 - xa1) * (x - xa1) + ya1
- 
-        # Roja: tramo final
-        (xr1, yr1), (xr2, yr2) = descarga_norm[1], descarga_norm[2]
-        f_roja = (yr2 - yr1) / (xr2 - xr1) * (x - xr1) + yr1
- 
-        sol = sp.solve(sp.Eq(f_azul, f_roja), x)
-        if sol:
-            x_cut = float(sol[0])
-            y_cut = float(f_azul.subs(x, x_cut))
+        # Caso normal: corte único entre el tramo inicial (azul) y el final (roja)
+        corte = line_intersection(carga_norm[0], carga_norm[1], descarga_norm[1], descarga_norm[2])
+        if corte:
+            x_cut, y_cut = corte
             corte_norm = (x_cut, y_cut)
             corte_raw = (
                 to_td(x_cut * quota_period_s),
@@ -134,15 +162,21 @@ class AnalysisResult:
     quota_value: float
     quota_period: TimeDuration
     exhaustion_threshold: TimeDuration
+    quota_index: int = 0
     
 
-def run_plan_analysis(plan: Plan) -> AnalysisResult:
+@instrumented
+def run_plan_analysis(plan: Plan, quota_index: int = 0) -> AnalysisResult:
     """
     Función de alto nivel que ejecuta el análisis y devuelve un objeto estructurado.
     Esta es la función que tu app de Streamlit llamará.
+
+    Args:
+        plan (Plan): El plan a analizar.
+        quota_index (int): La cuota del plan a analizar (0 es la primera).
     """
     # 1. Llama a tu función original para obtener el diccionario de datos
-    analysis_dict = generate_points_for_curves(plan)
+    analysis_dict = generate_points_for_curves(plan, quota_index)
 
     # 2. Crea y devuelve una instancia de AnalysisResult
     #    mapeando las claves del diccionario a los atributos del objeto.
@@ -157,10 +191,95 @@ def run_plan_analysis(plan: Plan) -> AnalysisResult:
         normalized_plateau_interval=analysis_dict["intervalo_corte_norm"],
         quota_value=analysis_dict["quota_value"],
         quota_period=analysis_dict["quota_period"],
-        exhaustion_threshold=analysis_dict["exhaustion_threshold"]
+        exhaustion_threshold=analysis_dict["exhaustion_threshold"],
+        quota_index=quota_index
     )
     
     return result
+
+
+@instrumented
+def run_plan_analysis_all_quotas(plan: Plan) -> List[AnalysisResult]:
+    """
+    Ejecuta el análisis de carga/descarga para cada cuota del plan.
+
+    Args:
+        plan (Plan): El plan a analizar.
+
+    Returns:
+        List[AnalysisResult]: Un resultado por cuota, de la más interna a la más externa.
+    """
+    return [run_plan_analysis(plan, i) for i in range(len(plan.bounded_rate.quota))]
+
+
+@instrumented
+def run_catalog_analysis(plans: Sequence[Plan], as_arrow: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Análisis de carga/descarga de todas las cuotas de muchos planes en una sola pasada
+    vectorizada, con una fila por (plan, cuota).
+
+    Para cada cuota con unidades Q, periodo P y umbral de agotamiento t*, y con
+    a = r/Q (r las unidades de la rate) y x1 = t*/P, las curvas normalizadas son:
+    carga de (0, a) a (x1, 1) y descarga de (1 - x1, 1) a (1, a). Si 2·t* < P hay
+    una meseta en [t*, P - t*]; si no, se cortan en x = 1/2, y = a + (1 - a)/(2·x1).
+
+    Args:
+        plans (Sequence[Plan]): Los planes a analizar.
+        as_arrow (bool): Si es True, devuelve una pyarrow.Table en lugar de un dict.
+
+    Returns:
+        Dict[str, np.ndarray]: Columnas plan_index, quota_index, rate_units,
+            quota_units, quota_period_ms, threshold_ms, has_intersection,
+            intersection_x, intersection_y (normalizadas), intersection_t_ms,
+            intersection_capacity, has_plateau, plateau_start_ms y plateau_end_ms.
+            Los valores que no aplican son NaN.
+    """
+    # 1) recoger los límites ya compilados de cada plan
+    plan_index, quota_index, rate_units, quota_units, periods, thresholds = [], [], [], [], [], []
+    for i, plan in enumerate(plans):
+        stack = plan.bounded_rate.limit_stack
+        for q in range(stack.depth - 1):
+            plan_index.append(i)
+            quota_index.append(q)
+            rate_units.append(stack.rate_units)
+            quota_units.append(stack.units[q + 1])
+            periods.append(stack.periods_ms[q + 1])
+            thresholds.append(stack.exhaustion_thresholds_ms[q])
+
+    r = np.asarray(rate_units, dtype=np.float64)
+    Q = np.asarray(quota_units, dtype=np.float64)
+    P = np.asarray(periods, dtype=np.float64)
+    T = np.asarray(thresholds, dtype=np.float64)
+
+    # 2) meseta central o corte único, en forma cerrada
+    a = r / Q
+    has_plateau = 2 * T < P
+    has_intersection = ~has_plateau & (a != 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_cut = np.where(has_intersection, 0.5, np.nan)
+        y_cut = np.where(has_intersection, a + (1 - a) / (2 * (T / P)), np.nan)
+
+    columns = {
+        "plan_index": np.asarray(plan_index, dtype=np.int64),
+        "quota_index": np.asarray(quota_index, dtype=np.int64),
+        "rate_units": r,
+        "quota_units": Q,
+        "quota_period_ms": P,
+        "threshold_ms": T,
+        "has_intersection": has_intersection,
+        "intersection_x": x_cut,
+        "intersection_y": y_cut,
+        "intersection_t_ms": x_cut * P,
+        "intersection_capacity": y_cut * Q,
+        "has_plateau": has_plateau,
+        "plateau_start_ms": np.where(has_plateau, T, np.nan),
+        "plateau_end_ms": np.where(has_plateau, P - T, np.nan),
+    }
+
+    if as_arrow:
+        import pyarrow as pa
+        return pa.table(columns)
+    return columns
     
     
 if __name__ == "__main__":
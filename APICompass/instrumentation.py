@@ -0,0 +1,204 @@
+"""
+Opt-in instrumentation of the APICompass entry points.
+
+Instrumented functions count their calls and accumulate their wall time, and
+record the size of the curves and figures they return. Nothing is recorded
+unless a profile is active:
+
+    from APICompass.instrumentation import profiling
+
+    with profiling() as profile:
+        plan.has_enough_capacity(demand)
+    print(profile.to_json())
+
+Setting the environment variable APICOMPASS_PROFILE=1 activates a global profile
+at import time, readable with get_profile(). If its value ends in '.json', the
+report is also written to that path when the interpreter exits.
+
+When no profile is active an instrumented call costs one extra function call
+and one global lookup. Timings are inclusive: the time of a call also counts in
+every instrumented function that called it.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, Optional
+
+PROFILE_ENV_VAR = "APICOMPASS_PROFILE"
+
+
+class Profile:
+    """
+    Counters collected while a profile is active: calls and timings per entry
+    point, points per curve and trace sizes per figure.
+    """
+
+    def __init__(self):
+        self.calls: Dict[str, Dict[str, float]] = {}
+        self.curves: Dict[str, Dict[str, int]] = {}
+        self.figures: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record_call(self, name: str, elapsed_s: float) -> None:
+        with self._lock:
+            stats = self.calls.get(name)
+            if stats is None:
+                stats = self.calls[name] = {"calls": 0, "total_s": 0.0, "max_s": 0.0}
+            stats["calls"] += 1
+            stats["total_s"] += elapsed_s
+            stats["max_s"] = max(stats["max_s"], elapsed_s)
+
+    def record_curve(self, name: str, points: int) -> None:
+        with self._lock:
+            stats = self.curves.get(name)
+            if stats is None:
+                stats = self.curves[name] = {"count": 0, "points": 0, "max_points": 0}
+            stats["count"] += 1
+            stats["points"] += points
+            stats["max_points"] = max(stats["max_points"], points)
+
+    def record_figure(self, name: str, trace_sizes: list) -> None:
+        with self._lock:
+            stats = self.figures.get(name)
+            if stats is None:
+                stats = self.figures[name] = {"count": 0, "traces": 0, "points": 0, "max_trace_points": 0}
+            stats["count"] += 1
+            stats["traces"] += len(trace_sizes)
+            stats["points"] += sum(trace_sizes)
+            stats["max_trace_points"] = max([stats["max_trace_points"], *trace_sizes])
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls.clear()
+            self.curves.clear()
+            self.figures.clear()
+
+    def to_dict(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """
+        Snapshot of the counters, with the mean time per call added.
+
+        Returns:
+            Dict: 'calls', 'curves' and 'figures', each keyed by qualified function name.
+        """
+        with self._lock:
+            calls = {
+                name: dict(stats, mean_s=stats["total_s"] / stats["calls"])
+                for name, stats in self.calls.items()
+            }
+            return {
+                "calls": calls,
+                "curves": {name: dict(stats) for name, stats in self.curves.items()},
+                "figures": {name: dict(stats) for name, stats in self.figures.items()},
+            }
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.to_dict(), indent=indent, sort_keys=True)
+
+
+# Perfil activo; None significa instrumentación desactivada
+_active: Optional[Profile] = None
+
+
+def instrumented(func: Callable) -> Callable:
+    """
+    Decorator that records the calls, wall time and returned curves/figures of a
+    function while a profile is active.
+
+    Args:
+        func (Callable): The function or method to instrument.
+
+    Returns:
+        Callable: The wrapped function.
+    """
+    name = f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        profile = _active
+        if profile is None:
+            return func(*args, **kwargs)
+
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        profile.record_call(name, time.perf_counter() - start)
+        _record_result(profile, name, result)
+        return result
+
+    return wrapper
+
+
+def _record_result(profile: Profile, name: str, result: Any) -> None:
+    # CapacityCurve y figuras de plotly, por duck typing para no importar plotly
+    if hasattr(result, "breakpoints") and hasattr(result, "__len__"):
+        profile.record_curve(name, len(result))
+    elif hasattr(result, "to_plotly_json"):
+        profile.record_figure(name, [
+            len(trace.x) if getattr(trace, "x", None) is not None else 0
+            for trace in result.data
+        ])
+
+
+def enable() -> Profile:
+    """
+    Activates a new profile, replacing the active one if any.
+
+    Returns:
+        Profile: The profile that collects from now on.
+    """
+    global _active
+    _active = Profile()
+    return _active
+
+
+def disable() -> Optional[Profile]:
+    """
+    Deactivates instrumentation.
+
+    Returns:
+        Optional[Profile]: The profile that was active, if any.
+    """
+    global _active
+    profile, _active = _active, None
+    return profile
+
+
+def is_enabled() -> bool:
+    return _active is not None
+
+
+def get_profile() -> Optional[Profile]:
+    return _active
+
+
+@contextmanager
+def profiling() -> Iterator[Profile]:
+    """
+    Collects into a fresh profile inside the block and restores the previous state on exit.
+
+    Yields:
+        Profile: The profile of the block, still readable after it ends.
+    """
+    global _active
+    previous = _active
+    _active = Profile()
+    try:
+        yield _active
+    finally:
+        _active = previous
+
+
+def _write_at_exit(path: str) -> None:
+    if _active is not None:
+        with open(path, "w") as f:
+            f.write(_active.to_json())
+
+
+_env_value = os.environ.get(PROFILE_ENV_VAR, "")
+if _env_value and _env_value != "0":
+    enable()
+    if _env_value.endswith(".json"):
+        atexit.register(_write_at_exit, _env_value)
@@ -1,4 +1,8 @@
+from functools import lru_cache
+from typing import List
 from APICompass.ancillary.time_unit import TimeDuration, TimeUnit
+from APICompass.instrumentation import instrumented
+import numpy as np
 import re
 
 def heaviside(x):
@@ -58,6 +62,28 @@ def format_time_with_unit(time_duration: TimeDuration) -> str:
 
     return time_string.rstrip(", ")
 
+def format_durations_ms(durations_ms, return_unit: TimeUnit = TimeUnit.MILLISECOND) -> List[str]:
+    """
+    Formatea un array de duraciones en milisegundos (p.ej. el resultado de min_time_many)
+    igual que min_time con display=True. Cada duración distinta se formatea una sola vez.
+
+    Args:
+        durations_ms (np.ndarray): Las duraciones en milisegundos.
+        return_unit (TimeUnit): La unidad a la que se convierte cada duración antes de formatearla.
+
+    Returns:
+        List[str]: Las duraciones formateadas, en el mismo orden.
+    """
+    durations_ms = np.asarray(durations_ms)
+    distinct, inverse = np.unique(durations_ms, return_inverse=True)
+    formatted = [
+        "0s" if t == 0 else format_time_with_unit(
+            TimeDuration(t, TimeUnit.MILLISECOND).to_desired_time_unit(return_unit)
+        )
+        for t in distinct.tolist()
+    ]
+    return [formatted[i] for i in inverse.ravel().tolist()]
+
 def select_best_time_unit(duration_ms: float) -> TimeDuration:
     """
     Selecciona la mejor unidad de tiempo para representar la duración, basado en la magnitud del valor en milisegundos.
@@ -108,38 +134,45 @@ def rearrange_time_axis_function(label, original_times_ms, calls, ax, fig, plan_
     ax.legend()
     fig.canvas.draw_idle()
 
+# Milisegundos por unidad, indexados por el sufijo usado en las cadenas de tiempo
+_UNIT_MS = {unit.value: unit.to_milliseconds() for unit in TimeUnit}
+_TIME_PATTERN = re.compile(r'(\d+(?:\.\d+)?)(ms|s|min|h|day|week|month|year)')
+
+PARSE_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
 def parse_time_string_to_duration(time_string: str) -> TimeDuration:
     """
     Convierte una cadena de tiempo formateada (e.g., '2.5s') en una instancia de TimeDuration.
 
+    Los resultados se guardan en una caché LRU acotada, indexada por la cadena, así que
+    las consultas repetidas ("1h", "30s"...) cuestan una búsqueda en un diccionario.
+    Solo los fallos de la caché pasan por la instrumentación. El TimeDuration
+    devuelto es compartido entre llamadas y no debe modificarse.
+
     Args:
         time_string (str): La cadena de tiempo formateada.
 
     Returns:
         TimeDuration: Una instancia de TimeDuration que representa la duración total.
     """
-    time_units = {
-        'ms': TimeUnit.MILLISECOND,
-        's': TimeUnit.SECOND,
-        'min': TimeUnit.MINUTE,
-        'h': TimeUnit.HOUR,
-        'day': TimeUnit.DAY,
-        'week': TimeUnit.WEEK,
-        'month': TimeUnit.MONTH,
-        'year': TimeUnit.YEAR
-    }
-
-    pattern = r'(\d+(\.\d+)?)(ms|s|min|h|day|week|month|year)'
-    matches = re.findall(pattern, time_string)
+    return _parse_time_string(time_string)
 
-    total_duration_ms = 0
-    for value, _, unit in matches:
-        duration = TimeDuration(float(value), time_units[unit])
-        total_duration_ms += duration.value * duration.unit.to_milliseconds()
 
-    total_duration = select_best_time_unit(total_duration_ms)
+@instrumented
+def _parse_time_string(time_string: str) -> TimeDuration:
+    # 1) camino rápido: un único token <número><unidad>
+    match = _TIME_PATTERN.fullmatch(time_string)
+    if match:
+        return select_best_time_unit(float(match.group(1)) * _UNIT_MS[match.group(2)])
+
+    # 2) caso general: sumar todos los componentes ('1day2.5min')
+    total_duration_ms = 0
+    for value, unit in _TIME_PATTERN.findall(time_string):
+        total_duration_ms += float(value) * _UNIT_MS[unit]
 
-    return total_duration
+    return select_best_time_unit(total_duration_ms)
 
 if __name__ == "__main__":
     print(parse_time_string_to_duration("1day2.5min"))
@@ -0,0 +1,275 @@
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional
+
+import numpy as np
+
+from APICompass.ancillary.time_unit import TimeDuration, TimeUnit
+from APICompass.basic.bounded_rate import BoundedRate, Quota, Rate
+from APICompass.basic.plan_and_demand import Demand, Plan
+from APICompass.utils import parse_time_string_to_duration
+
+# Horizontes y profundidades de cuota sobre los que crece cada caso
+HORIZONS = ["1h", "1day", "1week", "1month"]
+DEPTHS = [1, 2, 3, 4, 5]
+
+# Instantes consultados por cada medición de capacity_at
+CAPACITY_QUERIES = 200
+
+# Horizontes de la convolución min-plus (coste O(n*m) en el peor caso)
+CONVOLUTION_HORIZONS = ["1h", "1day"]
+
+# Duraciones de la demanda en request_delays (N peticiones crece con ellas)
+DELAY_DURATIONS = ["1h", "1day"]
+
+# Limitador propio delante de cada plan real en compose_in_series
+SERIES_GATEWAY = BoundedRate(Rate(5, "1s"))
+
+# Tamaños del catálogo sintético de la comparación en rejilla
+CATALOG_SIZES = [100, 1000]
+
+
+@dataclass(frozen=True)
+class BenchmarkCase:
+    """
+    A single measurement: setup() builds fresh inputs outside the timed region, so
+    cached properties of BoundedRate are cold on every repetition, and run(inputs)
+    is the timed call. points(result) is the size of what the call produced.
+    """
+    name: str
+    group: str
+    setup: Callable[[], Any]
+    run: Callable[[Any], Any]
+    points: Callable[[Any], int]
+    requires: Optional[str] = None
+
+
+# Planes reales de app/app.py (sin importar la app, que depende de streamlit)
+def real_world_plans() -> List[Plan]:
+    return [
+        Plan("Zenhub Enterprise", BoundedRate(rate=Rate(100, "1min"), quota=[Quota(5000, "1h")]), 0, 0, 1, "1month"),
+        Plan("Github GET", BoundedRate(rate=Rate(900, "1min"), quota=[Quota(5000, "1h")]), 0, 0, 1, "1month"),
+        Plan("Google Cloud NL", BoundedRate(rate=Rate(600, "1min"), quota=[Quota(800000, "1day")]), 0, 0, 1, "1month"),
+        Plan("Azure AI", BoundedRate(rate=Rate(33334, "1min"), quota=[Quota(2000000, "1h")]), 0, 0, 1, "1month"),
+    ]
+
+
+def deep_quota_bounded_rate(depth: int) -> BoundedRate:
+    """
+    Synthetic stack of 10 req/s under `depth` nested quotas (1min, 1h, 1day, 1week,
+    1month). Each quota allows half of what the level below could serve in its
+    period, so every level is valid and binding.
+    """
+    periods = ["1min", "1h", "1day", "1week", "1month"]
+    if not 1 <= depth <= len(periods):
+        raise ValueError(f"depth must be between 1 and {len(periods)}")
+
+    rate = Rate(10, "1s")
+    quotas = []
+    units, period_ms = rate.consumption_unit, rate.period_ms
+    for period in periods[:depth]:
+        next_period_ms = parse_time_string_to_duration(period).to_milliseconds()
+        units = int(units * (next_period_ms / period_ms) / 2)
+        period_ms = next_period_ms
+        quotas.append(Quota(units, period))
+    return BoundedRate(rate, quotas)
+
+
+def _fresh(bounded_rate: BoundedRate) -> BoundedRate:
+    # Misma definición, sin cachés calientes
+    return BoundedRate(bounded_rate.rate, list(bounded_rate.quota), bounded_rate.max_active_time)
+
+
+def _fresh_plan(plan: Plan) -> Plan:
+    return Plan(plan.name, _fresh(plan.bounded_rate), plan.cost, plan.overage_cost,
+                plan.max_number_of_subscriptions, plan.billing_period)
+
+
+def _capacity_at(bounded_rate: BoundedRate, horizon: str) -> BenchmarkCase:
+    horizon_ms = parse_time_string_to_duration(horizon).to_milliseconds()
+    instants = [TimeDuration(t, TimeUnit.MILLISECOND) for t in np.linspace(0, horizon_ms, CAPACITY_QUERIES).tolist()]
+
+    def run(br):
+        return [br.capacity_at(t) for t in instants]
+
+    return BenchmarkCase(f"capacity_at[{horizon}]", "capacity_at", lambda: _fresh(bounded_rate), run, len)
+
+
+def _available_curve(bounded_rate: BoundedRate, horizon: str) -> BenchmarkCase:
+    return BenchmarkCase(
+        f"show_available_capacity_curve[{horizon}]", "show_available_capacity_curve",
+        lambda: _fresh(bounded_rate),
+        lambda br: br.show_available_capacity_curve(horizon, debug=True),
+        len
+    )
+
+
+def _inflection_points(bounded_rate: BoundedRate, horizon: str) -> BenchmarkCase:
+    return BenchmarkCase(
+        f"calculate_inflection_points[{horizon}]", "calculate_inflection_points",
+        lambda: _fresh(bounded_rate),
+        lambda br: br.calculate_inflection_points(horizon),
+        len
+    )
+
+
+def _has_enough_capacity(plan: Plan, duration: str) -> BenchmarkCase:
+    # Demanda al 90% de la rate del plan, sin cuotas: acumula backlog contra las cuotas
+    rate = plan.bounded_rate.rate
+    demand_rate = Rate(max(int(rate.consumption_unit * 0.9), 1), rate.consumption_period)
+    return BenchmarkCase(
+        f"has_enough_capacity[{plan.name}, {duration}]", "has_enough_capacity",
+        lambda: (_fresh_plan(plan), Demand(demand_rate, duration=duration)),
+        lambda inputs: inputs[0].has_enough_capacity(inputs[1]),
+        lambda result: len(result.get("scheduled_requests", []))
+    )
+
+
+def _compare_bounded_rates(bounded_rates: List[BoundedRate], horizon: str) -> BenchmarkCase:
+    def points(fig):
+        return sum(len(trace.x) for trace in fig.data if trace.x is not None)
+
+    def run(brs):
+        from APICompass.basic.compare_curves import compare_bounded_rates_capacity
+        return compare_bounded_rates_capacity(brs, horizon, return_fig=True)
+
+    return BenchmarkCase(
+        f"compare_bounded_rates_capacity[{horizon}]", "compare_bounded_rates_capacity",
+        lambda: [_fresh(br) for br in bounded_rates], run, points, requires="plotly"
+    )
+
+
+def synthetic_catalog(size: int) -> List[BoundedRate]:
+    """
+    Deterministic catalog of `size` bounded rates: 10-1000 req/min under an hourly
+    quota of 10-60 minutes of that rate.
+    """
+    rng = np.random.default_rng(size)
+    rates = rng.integers(10, 1000, size).tolist()
+    minutes = rng.integers(10, 60, size).tolist()
+    return [BoundedRate(Rate(r, "1min"), [Quota(r * m, "1h")]) for r, m in zip(rates, minutes)]
+
+
+def _compare_grid(bounded_rates: List[BoundedRate], horizon: str) -> BenchmarkCase:
+    def points(fig):
+        return sum(len(trace.x) for trace in fig.data if trace.x is not None)
+
+    def run(brs):
+        from APICompass.basic.compare_curves import compare_bounded_rates_capacity_grid
+        return compare_bounded_rates_capacity_grid(brs, horizon, return_fig=True)
+
+    return BenchmarkCase(
+        f"compare_bounded_rates_capacity_grid[{horizon}]@{len(bounded_rates)} curves",
+        "compare_bounded_rates_capacity_grid",
+        lambda: [_fresh(br) for br in bounded_rates], run, points, requires="plotly"
+    )
+
+
+def _request_delays(plan: Plan, duration: str) -> BenchmarkCase:
+    # Demanda al 90% de la rate del plan, como en has_enough_capacity
+    rate = plan.bounded_rate.rate
+    demand_rate = Rate(max(int(rate.consumption_unit * 0.9), 1), rate.consumption_period)
+    return BenchmarkCase(
+        f"request_delays[{plan.name}, {duration}]", "request_delays",
+        lambda: (_fresh_plan(plan), Demand(demand_rate, duration=duration)),
+        lambda inputs: inputs[0].request_delays(inputs[1]),
+        lambda result: result.delays_ms.size
+    )
+
+
+def _convolution(f: BoundedRate, g: BoundedRate, horizon: str) -> BenchmarkCase:
+    from APICompass.basic.network_calculus import min_plus_convolution
+
+    def setup():
+        return (_fresh(f).show_available_capacity_curve(horizon, debug=True),
+                _fresh(g).show_available_capacity_curve(horizon, debug=True))
+
+    return BenchmarkCase(
+        f"min_plus_convolution[{horizon}]", "min_plus_convolution",
+        setup, lambda curves: min_plus_convolution(*curves), len
+    )
+
+
+def _compose_in_series(gateway: BoundedRate, plan: Plan) -> BenchmarkCase:
+    from APICompass.basic.tandem import compose_in_series
+
+    return BenchmarkCase(
+        f"compose_in_series[{plan.name}]", "compose_in_series",
+        lambda: [_fresh(gateway), _fresh(plan.bounded_rate)], compose_in_series,
+        lambda br: len(br.limits)
+    )
+
+
+def _plan_analysis(plan: Plan, label: str, all_quotas: bool) -> BenchmarkCase:
+    from APICompass.curves.charge import run_plan_analysis, run_plan_analysis_all_quotas
+
+    def points(results):
+        results = results if isinstance(results, list) else [results]
+        return sum(len(r.raw_load_points) + len(r.raw_discharge_points) for r in results)
+
+    run = run_plan_analysis_all_quotas if all_quotas else run_plan_analysis
+    return BenchmarkCase(
+        f"run_plan_analysis[{label}]", "run_plan_analysis",
+        lambda: _fresh_plan(plan), run, points
+    )
+
+
+def build_cases(quick: bool = False) -> List[BenchmarkCase]:
+    """
+    Every benchmark case, for the real-world plans and the synthetic deep-quota stacks.
+
+    Args:
+        quick (bool): Only the shortest and longest horizons and depths.
+
+    Returns:
+        List[BenchmarkCase]: The cases, grouped by the function they measure.
+    """
+    horizons = [HORIZONS[0], HORIZONS[-1]] if quick else HORIZONS
+    depths = [DEPTHS[0], DEPTHS[-1]] if quick else DEPTHS
+    plans = real_world_plans()
+    deep = {depth: deep_quota_bounded_rate(depth) for depth in depths}
+    cases = []
+
+    # 1) crecimiento con el horizonte: planes reales
+    for plan in plans:
+        for horizon in horizons:
+            for make in (_capacity_at, _available_curve, _inflection_points):
+                case = make(plan.bounded_rate, horizon)
+                cases.append(_rename(case, f"{case.name}@{plan.name}"))
+        for duration in horizons:
+            cases.append(_has_enough_capacity(plan, duration))
+        cases.append(_plan_analysis(plan, plan.name, all_quotas=False))
+
+    for horizon in horizons:
+        cases.append(_compare_bounded_rates([p.bounded_rate for p in plans], horizon))
+    for duration in DELAY_DURATIONS:
+        cases.append(_request_delays(plans[1], duration))
+    for horizon in CONVOLUTION_HORIZONS:
+        cases.append(_convolution(plans[0].bounded_rate, plans[1].bounded_rate, horizon))
+    month_quota = Plan(
+        f"{plans[2].name} + month quota",
+        BoundedRate(plans[2].bounded_rate.rate, [*plans[2].bounded_rate.quota, Quota(2000000, "1month")]),
+        0, 0, 1, "1month"
+    )
+    for plan in plans + [month_quota]:
+        cases.append(_compose_in_series(SERIES_GATEWAY, plan))
+
+    # 2) crecimiento con la profundidad: pilas sintéticas al horizonte más largo
+    horizon = horizons[-1]
+    for depth, br in deep.items():
+        for make in (_capacity_at, _available_curve, _inflection_points):
+            case = make(br, horizon)
+            cases.append(_rename(case, f"{case.name}@depth={depth}"))
+        plan = Plan(f"depth={depth}", br, 0, 0, 1, "1month")
+        cases.append(_plan_analysis(plan, f"depth={depth}, all quotas", all_quotas=True))
+    cases.append(_rename(_compare_bounded_rates(list(deep.values()), horizon),
+                         f"compare_bounded_rates_capacity[{horizon}]@depths={','.join(map(str, depths))}"))
+
+    # 3) crecimiento con el número de curvas: rejilla común
+    for size in CATALOG_SIZES:
+        cases.append(_compare_grid(synthetic_catalog(size), "1day"))
+
+    return cases
+
+
+def _rename(case: BenchmarkCase, name: str) -> BenchmarkCase:
+    return BenchmarkCase(name, case.group, case.setup, case.run, case.points, case.requires)
@@ -0,0 +1,222 @@
+"""
+Benchmark suite for the capacity engine and the plan analysis hot paths.
+
+Usage (from the repository root):
+
+    python -m benchmarks.run                  # run and compare with benchmarks/baseline.json
+    python -m benchmarks.run --quick          # shortest and longest horizons/depths only
+    python -m benchmarks.run --save-baseline  # overwrite the stored baseline
+    python -m benchmarks.run -k inflection    # only cases whose name contains 'inflection'
+
+For each case it records the best wall time of --repeat runs, the peak memory
+traced by tracemalloc in one extra run and the number of points produced. The
+import time and peak RSS of the main modules are measured in fresh interpreters.
+A case regresses when it is slower than --time-tolerance or uses more memory
+than --memory-tolerance times its baseline, or when it produces a different
+number of points. Slowdowns under --min-time-ms are treated as noise. Exits
+with status 1 if any case regresses.
+"""
+import argparse
+import gc
+import importlib.util
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+from benchmarks.cases import BenchmarkCase, build_cases
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos cuyo coste de importación se mide en un intérprete limpio
+IMPORT_TARGETS = [
+    "APICompass.basic.bounded_rate",
+    "APICompass.basic.plan_and_demand",
+    "APICompass.curves.charge",
+    "APICompass.basic.compare_curves",
+]
+
+_IMPORT_PROBE = """
+import resource, sys, time
+t = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t
+heavy = sorted(m for m in ("plotly", "matplotlib", "sympy") if m in sys.modules)
+print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, ",".join(heavy))
+"""
+
+
+def measure_case(case: BenchmarkCase, repeat: int) -> Dict[str, float]:
+    """
+    Measures a case: best wall time of `repeat` runs, then peak traced memory in one more run.
+
+    Args:
+        case (BenchmarkCase): The case to measure.
+        repeat (int): Number of timed runs.
+
+    Returns:
+        Dict[str, float]: wall_time_s, peak_memory_kb and points.
+    """
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        inputs = case.setup()
+        gc.collect()
+        start = time.perf_counter()
+        result = case.run(inputs)
+        best = min(best, time.perf_counter() - start)
+
+    inputs = case.setup()
+    gc.collect()
+    tracemalloc.start()
+    case.run(inputs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"wall_time_s": best, "peak_memory_kb": peak / 1024, "points": case.points(result)}
+
+
+def measure_import(module: str, repeat: int) -> Dict[str, float]:
+    """
+    Measures the import of a module in fresh interpreters.
+
+    Args:
+        module (str): The dotted module name.
+        repeat (int): Number of interpreters to start.
+
+    Returns:
+        Dict[str, float]: Best import wall time, peak RSS in KB (Linux units) and
+            the heavy plotting/symbolic packages it pulled in.
+    """
+    best_time, best_rss, heavy = float("inf"), float("inf"), ""
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", _IMPORT_PROBE.format(module=module)],
+            capture_output=True, text=True, check=True, env=env
+        ).stdout.split()
+        best_time = min(best_time, float(out[0]))
+        best_rss = min(best_rss, float(out[1]))
+        heavy = out[2] if len(out) > 2 else ""
+    return {"wall_time_s": best_time, "peak_memory_kb": best_rss, "points": 0, "heavy_imports": heavy}
+
+
+def run_suite(cases: List[BenchmarkCase], repeat: int, imports: bool) -> Dict[str, Dict[str, float]]:
+    results = {}
+    if imports:
+        for module in IMPORT_TARGETS:
+            name = f"import[{module}]"
+            results[name] = dict(measure_import(module, repeat), group="import")
+            _report(name, results[name])
+
+    for case in cases:
+        if case.requires and importlib.util.find_spec(case.requires) is None:
+            print(f"{case.name:<70} skipped (requires {case.requires})")
+            continue
+        results[case.name] = dict(measure_case(case, repeat), group=case.group)
+        _report(case.name, results[case.name])
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    time_tolerance: float,
+    memory_tolerance: float,
+    min_time_s: float = 0.0
+) -> List[str]:
+    """
+    Compares a run against the stored baseline.
+
+    Args:
+        results (Dict[str, Dict[str, float]]): The measurements of this run.
+        baseline (Dict[str, Dict[str, float]]): The stored measurements.
+        time_tolerance (float): Allowed ratio between the new and the stored wall time.
+        memory_tolerance (float): Allowed ratio between the new and the stored peak memory.
+        min_time_s (float): Slowdowns smaller than this, in seconds, are ignored.
+
+    Returns:
+        List[str]: One message per regression.
+    """
+    regressions = []
+    for name, new in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        if new["points"] != old["points"]:
+            regressions.append(f"{name}: {new['points']} points, baseline {old['points']}")
+        slowdown = new["wall_time_s"] - old["wall_time_s"]
+        if new["wall_time_s"] > old["wall_time_s"] * time_tolerance and slowdown > min_time_s:
+            regressions.append(
+                f"{name}: {new['wall_time_s'] * 1e3:.2f}ms, baseline {old['wall_time_s'] * 1e3:.2f}ms"
+            )
+        if new["peak_memory_kb"] > old["peak_memory_kb"] * memory_tolerance:
+            regressions.append(
+                f"{name}: {new['peak_memory_kb']:.0f}KB, baseline {old['peak_memory_kb']:.0f}KB"
+            )
+        if new.get("heavy_imports", "") != old.get("heavy_imports", ""):
+            regressions.append(
+                f"{name}: imports '{new['heavy_imports']}', baseline '{old.get('heavy_imports', '')}'"
+            )
+    return regressions
+
+
+def _report(name: str, measurement: Dict[str, float]) -> None:
+    print(
+        f"{name:<70} {measurement['wall_time_s'] * 1e3:>10.2f}ms "
+        f"{measurement['peak_memory_kb']:>12.0f}KB {measurement['points']:>10}"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="only the shortest and longest horizons and depths")
+    parser.add_argument("-k", dest="keyword", default=None, help="only cases whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case (best one is kept)")
+    parser.add_argument("--no-imports", action="store_true", help="skip the import time/RSS measurements")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline file to compare with or save to")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--time-tolerance", type=float, default=1.5)
+    parser.add_argument("--memory-tolerance", type=float, default=1.25)
+    parser.add_argument("--min-time-ms", type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    cases = build_cases(quick=args.quick)
+    if args.keyword:
+        cases = [case for case in cases if args.keyword in case.name]
+
+    print(f"{'case':<70} {'wall time':>12} {'peak memory':>14} {'points':>10}")
+    results = run_suite(cases, args.repeat, imports=not args.no_imports and not args.keyword)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "results": results,
+            }, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.time_tolerance, args.memory_tolerance,
+                          args.min_time_ms / 1e3)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    print(f"{len(regressions)} regression(s) against {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from APICompass.basic.backends import CapacityBackend
+from APICompass.basic.bounded_rate import BoundedRate, Quota, Rate
+
+
+def test_backend_without_evaluate_fails_on_creation():
+    class Incomplete(CapacityBackend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError, match="evaluate"):
+        Incomplete()
+
+
+def test_custom_backend_matches_exact():
+    class Custom(CapacityBackend):
+        name = "custom"
+
+        def evaluate(self, stack, t_ms):
+            return stack.capacity_at_many(t_ms)
+
+    bounded_rate = BoundedRate(Rate(3, "1s"), Quota(20, "1min"))
+    exact = bounded_rate.show_available_capacity_curve("5min", debug=True)
+    custom = bounded_rate.show_available_capacity_curve("5min", debug=True, backend=Custom())
+    np.testing.assert_array_equal(custom.breakpoints, exact.breakpoints)
+    np.testing.assert_array_equal(custom.values, exact.values)
+
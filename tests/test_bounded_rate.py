@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from APICompass.basic.bounded_rate import BoundedRate, Quota, Rate
+
+
+@pytest.mark.parametrize("limit", [
+    Rate(3, "1s"),
+    Quota(10, "1min"),
+    BoundedRate(Rate(3, "1s"), Quota(10, "1min")),
+])
+def test_min_time_many_requires_integer_goals(limit):
+    assert limit.min_time_many(np.array([0, 1, 4])).dtype == np.int64
+    with pytest.raises(TypeError):
+        limit.min_time_many(np.array([1.5]))
+
+
+@pytest.mark.parametrize("bounded_rate, horizon", [
+    (BoundedRate(Rate(3, "250ms"), [Quota(4, "1750ms"), Quota(10, "8750ms"), Quota(15, "61250ms")]), "183756ms"),
+    (BoundedRate(Rate(3, "250.5ms"), [Quota(4, "1753.5ms"), Quota(10, "8767.5ms")]), "60s"),
+    (BoundedRate(Rate(2, "0.75ms"), [Quota(5, "2.5ms"), Quota(9, "7.5ms")]), "100ms"),
+])
+def test_inflection_points_follow_the_curve_with_fractional_periods(bounded_rate, horizon):
+    t, c = np.array(list(bounded_rate.calculate_inflection_points(horizon))).T
+    curve = bounded_rate.periodic_curve
+
+    assert np.all(np.diff(t) >= 0) and np.all(np.diff(c) >= 0)
+    assert (t[0], c[0]) == (0.0, curve.at(0))
+    assert c[-1] == curve.at(t[-1])
+    # cada punto está en la curva: en su instante o justo antes (final de una meseta)
+    assert np.all((c == curve.at_many(t)) | (c == curve.at_many(t - 1e-6)))
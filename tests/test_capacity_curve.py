@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from APICompass.basic.backends import BACKENDS
+from APICompass.basic.backlog import compute_backlog
+from APICompass.basic.bounded_rate import BoundedRate, Quota, Rate
+from APICompass.basic.capacity_curve import CapacityCurve
+from APICompass.basic.network_calculus import min_plus_convolution, min_plus_deconvolution
+
+# Periodos con fracción de milisegundo: los que antes se recortaban a ms enteros
+PLAN = BoundedRate(Rate(3, "250.5ms"), [Quota(4, "1753.5ms"), Quota(10, "8767.5ms")])
+DEMAND = BoundedRate(Rate(2, "0.75s"), Quota(9, "4.5s"))
+HORIZON = "30s"
+
+
+def _accumulated(bounded_rate: BoundedRate) -> CapacityCurve:
+    return bounded_rate.show_available_capacity_curve(HORIZON, debug=True)
+
+
+# Todo lo que construye una CapacityCurve a partir de límites o de otras curvas
+PRODUCERS = {
+    "rate": lambda: Rate(3, "250.5ms").show_capacity(HORIZON, debug=True),
+    "accumulated": lambda: _accumulated(PLAN),
+    "instantaneous": lambda: PLAN.show_instantaneous_capacity_curve(HORIZON, debug=True),
+    "show_capacity": lambda: PLAN.show_capacity(HORIZON, debug=True),
+    "inflection_points": lambda: PLAN.calculate_inflection_points(HORIZON),
+    "periodic_window": lambda: PLAN.periodic_curve.window,
+    "decimate": lambda: _accumulated(PLAN).decimate(16),
+    "slice": lambda: _accumulated(PLAN)[3:9],
+    "backlog": lambda: compute_backlog(_accumulated(PLAN), _accumulated(DEMAND)).curve,
+    "convolution": lambda: min_plus_convolution(_accumulated(PLAN), _accumulated(DEMAND)),
+    "deconvolution": lambda: min_plus_deconvolution(_accumulated(DEMAND), _accumulated(PLAN), 20000),
+    **{
+        f"backend_{name}": (lambda backend=backend: PLAN.show_available_capacity_curve(HORIZON, debug=True, backend=backend))
+        for name, backend in BACKENDS.items()
+    },
+}
+
+
+def test_constructor_rejects_unsorted_breakpoints():
+    with pytest.raises(ValueError, match="ascending"):
+        CapacityCurve(np.array([0.0, 2.0, 1.0]), np.array([1.0, 2.0, 3.0]))
+
+
+@pytest.mark.parametrize("producer", PRODUCERS.values(), ids=PRODUCERS.keys())
+def test_producers_build_sorted_curves_with_fractional_periods(producer):
+    curve = producer()
+
+    assert isinstance(curve, CapacityCurve) and len(curve) > 1
+    assert np.all(np.diff(curve.breakpoints) >= 0)
@@ -0,0 +1,27 @@
+import pytest
+
+from APICompass.basic.bounded_rate import BoundedRate, Quota, Rate
+from APICompass.basic.plan_and_demand import Plan
+from APICompass.curves.charge import generate_points_for_curves
+
+
+def test_generate_points_for_curves_names_the_omitted_quota():
+    # 10/min nunca llega a 20000 en una hora: la cuota se omite
+    plan = Plan("x", BoundedRate(Rate(10, "1min"), Quota(20000, "1h")), 0, 0, 1, "1month")
+
+    with pytest.raises(ValueError, match="exceeds_rate_capacity"):
+        generate_points_for_curves(plan)
+
+
+def test_generate_points_for_curves_rejects_plan_without_quota():
+    plan = Plan("z", BoundedRate(Rate(100, "1min")), 0, 0, 1, "1month")
+
+    with pytest.raises(ValueError, match="no quota 0"):
+        generate_points_for_curves(plan)
+
+
+def test_generate_points_for_curves_rejects_missing_quota_index():
+    plan = Plan("z", BoundedRate(Rate(100, "1min"), Quota(5000, "1h")), 0, 0, 1, "1month")
+
+    with pytest.raises(ValueError, match="no quota 3"):
+        generate_points_for_curves(plan, 3)
@@ -0,0 +1,43 @@
+import pytest
+
+from APICompass.basic.bounded_rate import BoundedRate, Quota, Rate
+from APICompass.basic.feasibility import check_feasibility, check_unbounded_feasibility, hyperperiod_ms
+from APICompass.basic.plan_and_demand import Demand, Plan
+
+
+def test_hyperperiod_of_periods_that_are_not_whole_milliseconds():
+    assert hyperperiod_ms(250.5, 1000) == 501000
+    assert hyperperiod_ms(0.75, 2.5) == 7.5
+    assert hyperperiod_ms(1753.5, 8767.5) == 8767.5
+
+
+@pytest.mark.parametrize("plan, demand", [
+    # la demanda gana más en cada hiperperiodo y acaba fallando
+    (BoundedRate(Rate(3, "250.5ms"), Quota(10, "1002ms")), BoundedRate(Rate(1, "100.1ms"))),
+    # el plan gana más y nunca falla
+    (BoundedRate(Rate(3, "250.5ms"), Quota(10, "1002ms")), BoundedRate(Rate(2, "300.6ms"))),
+    # falla desde el primer instante
+    (BoundedRate(Rate(2, "0.75ms"), Quota(5, "2.5ms")), BoundedRate(Rate(3, "1.5ms"), Quota(4, "3.75ms"))),
+])
+def test_unbounded_feasibility_with_fractional_periods_matches_a_long_check(plan, demand):
+    horizon_ms = 50 * hyperperiod_ms(plan.limit_stack.top_period_ms, demand.limit_stack.top_period_ms)
+
+    unbounded = check_unbounded_feasibility(plan.limit_stack, demand.periodic_curve)
+    bounded = check_feasibility(plan.limit_stack, demand.periodic_curve, horizon_ms)
+
+    assert unbounded.feasible == bounded.feasible
+    if not bounded.feasible:
+        assert unbounded.violation_time_ms == pytest.approx(bounded.violation_time_ms)
+        assert unbounded.deficit == bounded.deficit
+
+
+def test_hyperperiod_too_long_raises_instead_of_tiling_it():
+    with pytest.raises(ValueError, match="hyperperiod"):
+        hyperperiod_ms(1234.567891, 987.654321)
+
+    plan = Plan("p", BoundedRate(Rate(5, "1234.567891ms")), 0, 0, 1, "1month")
+    demand = Demand(Rate(1, "987.654321ms"))
+    with pytest.raises(ValueError, match="time_interval"):
+        plan.check_feasibility(demand)
+    with pytest.raises(ValueError, match="time_interval"):
+        plan.service_bounds(demand)
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+go = pytest.importorskip("plotly.graph_objects")
+
+from APICompass.ancillary import figure_builder
+from APICompass.ancillary.figure_builder import build_figure, trace
+from APICompass.basic.bounded_rate import BoundedRate, Quota, Rate
+
+
+def test_plotly_still_has_the_private_validate_flag():
+    # build_figure depende de él para no validar las trazas; si desaparece, avisar aquí
+    fig = go.Figure(data=[dict(type="scatter", x=[0, 1], y=[0, 1])], _validate=False)
+    assert all(obj._validate is False for obj in (fig, fig.layout, *fig.data))
+
+
+def test_build_figure_keeps_arrays_and_validates_later_updates():
+    x = np.arange(10, dtype=np.float64)
+    fig = build_figure([trace(x, 2 * x, mode="lines")], layout=dict(template="plotly_white"))
+
+    assert isinstance(fig.data[0].x, np.ndarray)
+    np.testing.assert_array_equal(fig.data[0].y, 2 * x)
+    with pytest.raises(ValueError):
+        fig.update_layout(not_a_property=1)
+
+
+def test_build_figure_falls_back_to_the_public_constructor(monkeypatch):
+    x = np.arange(10, dtype=np.float64)
+    traces = [trace(x, x, mode="lines", name="a")]
+    fast = build_figure(traces)
+
+    monkeypatch.setattr(figure_builder, "_unvalidated_figure", lambda go, traces: None)
+    assert build_figure(traces).to_dict() == fast.to_dict()
+
+
+def test_accumulated_and_instantaneous_toggle_keeps_array_traces():
+    bounded_rate = BoundedRate(Rate(3, "1s"), Quota(20, "1min"))
+    fig = bounded_rate.show_capacity("5min", return_fig=True)
+
+    assert [tr.visible for tr in fig.data] == [True, False]
+    assert all(isinstance(tr.x, np.ndarray) for tr in fig.data)
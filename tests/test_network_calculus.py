@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+from APICompass.basic.bounded_rate import BoundedRate, Quota, Rate
+from APICompass.basic.capacity_curve import CapacityCurve
+from APICompass.basic.network_calculus import (
+    horizontal_deviation,
+    min_plus_convolution,
+    min_plus_deconvolution,
+    vertical_deviation,
+)
+
+HORIZON_MS = 60
+
+# Con breakpoints enteros las curvas son constantes en cada (k, k + 1), así que
+# una rejilla de medio milisegundo ve también los valores justo antes de cada salto
+HALF_GRID = np.arange(0, 2 * HORIZON_MS + 1) / 2
+
+# s y t - s a la vez dentro de un intervalo, para t en la rejilla de medio milisegundo
+QUARTER_GRID = np.arange(0, 4 * HORIZON_MS + 1) / 4
+
+
+def _random_curve(rng: np.random.Generator) -> CapacityCurve:
+    inner = rng.choice(np.arange(1, HORIZON_MS), size=int(rng.integers(1, 12)), replace=False)
+    breakpoints = np.concatenate(([0], np.sort(inner), [HORIZON_MS]))
+    values = np.cumsum(rng.integers(0, 4, size=breakpoints.size))
+    return CapacityCurve(breakpoints, values)
+
+
+def _stack_curve(bounded_rate: BoundedRate) -> CapacityCurve:
+    return bounded_rate.show_available_capacity_curve(f"{HORIZON_MS}ms", debug=True)
+
+
+def _pairs():
+    rng = np.random.default_rng(2024)
+    pairs = [(_random_curve(rng), _random_curve(rng)) for _ in range(40)]
+    stacks = [
+        BoundedRate(Rate(3, "7ms"), Quota(10, "40ms")),
+        BoundedRate(Rate(2, "5ms"), Quota(5, "20ms")),
+        BoundedRate(Rate(1, "3ms")),
+        BoundedRate(Rate(4, "10ms"), Quota(9, "30ms")),
+    ]
+    pairs += [(_stack_curve(a), _stack_curve(b)) for a in stacks for b in stacks]
+    return pairs
+
+
+PAIRS = _pairs()
+
+
+def _value(curve: CapacityCurve, t: np.ndarray) -> np.ndarray:
+    # Convenio de network calculus: toda curva vale 0 en t = 0
+    return np.where(t > 0, curve.at_many(t), 0.0)
+
+
+def _brute_convolution(f: CapacityCurve, g: CapacityCurve, t: float) -> float:
+    s = QUARTER_GRID[QUARTER_GRID <= t]
+    return float(np.min(_value(f, s) + _value(g, t - s)))
+
+
+def _brute_deconvolution(f: CapacityCurve, g: CapacityCurve, t: float) -> float:
+    u = HALF_GRID[HALF_GRID <= HORIZON_MS - t]
+    return float(np.max(_value(f, t + u) - _value(g, u)))
+
+
+@pytest.mark.parametrize("f, g", PAIRS)
+def test_min_plus_convolution_matches_brute_force(f, g):
+    result = min_plus_convolution(f, g, HORIZON_MS)
+
+    t = HALF_GRID[1:]
+    expected = [_brute_convolution(f, g, ti) for ti in t]
+    np.testing.assert_array_equal(result.at_many(t), expected)
+
+
+@pytest.mark.parametrize("f, g", PAIRS)
+def test_min_plus_deconvolution_matches_brute_force(f, g):
+    result = min_plus_deconvolution(f, g, HORIZON_MS)
+
+    # constante entre breakpoints enteros: exacta en cada (k, k + 1)
+    inside = HALF_GRID[1::2]
+    expected = [_brute_deconvolution(f, g, ti) for ti in inside]
+    np.testing.assert_array_equal(result.at_many(inside), expected)
+
+    # en los saltos se devuelve el valor justo después, que nunca queda por debajo
+    jumps = HALF_GRID[2::2]
+    exact = np.array([_brute_deconvolution(f, g, ti) for ti in jumps])
+    assert np.all(result.at_many(jumps) >= exact)
+
+
+@pytest.mark.parametrize("arrival, service", PAIRS)
+def test_vertical_deviation_matches_brute_force(arrival, service):
+    backlog, _ = vertical_deviation(arrival, service)
+
+    t = HALF_GRID[1:]
+    expected = max(0.0, float(np.max(arrival.at_many(t) - service.at_many(t))))
+    assert backlog == expected
+
+
+@pytest.mark.parametrize("arrival, service", PAIRS)
+def test_horizontal_deviation_matches_brute_force(arrival, service):
+    delay_ms, _ = horizontal_deviation(arrival, service)
+
+    # la demanda es constante en [k, k + 1): la espera más larga empieza en un entero
+    t = np.arange(HORIZON_MS + 1, dtype=np.float64)
+    demand = arrival.at_many(t)
+    served = service.at_many(t)
+    first = np.array([
+        float(t[np.argmax(served >= d)]) if served[-1] >= d else np.inf
+        for d in demand
+    ])
+    expected = max(0.0, float(np.max(first - t)))
+    assert delay_ms == expected
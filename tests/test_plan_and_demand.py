@@ -0,0 +1,46 @@
+from math import inf
+
+from APICompass.basic.bounded_rate import BoundedRate, Quota, Rate
+from APICompass.basic.plan_and_demand import Demand, Plan
+
+
+def _daily_quota_plan() -> Plan:
+    return Plan("1/s + 50000/day", BoundedRate(Rate(1, "1s"), Quota(50000, "1day")), 0, 0, 1, "1month")
+
+
+def test_has_enough_capacity_analyses_whole_demand_when_plan_falls_behind():
+    plan = _daily_quota_plan()
+    demand = Demand(1, "1s", "3day")
+
+    analysis = plan.has_enough_capacity(demand)
+    bounds = plan.service_bounds(demand)
+
+    assert not plan.check_feasibility(demand).feasible
+    assert bounds.backlog == 109200
+    assert bounds.delay_ms == 182000000
+    assert analysis["max_backlog"] == plan.backlog(demand, "3day").max_backlog == bounds.backlog
+    assert analysis["delay_bound"] == bounds.delay_ms / 1000
+
+
+def test_has_enough_capacity_rejects_unbounded_demand_that_outpaces_plan():
+    plan = _daily_quota_plan()
+    demand = Demand(1, "1s")
+
+    analysis = plan.has_enough_capacity(demand)
+
+    assert plan.service_bounds(demand).backlog == inf
+    assert not plan.check_feasibility(demand).feasible
+    assert analysis["can_cover"] is False
+    assert analysis["max_backlog"] == inf
+    assert analysis["delay_bound"] == inf
+
+
+def test_scheduled_requests_one_every_plan_period():
+    plan = Plan("100/min + 5000/h", BoundedRate(Rate(100, "1min"), Quota(5000, "1h")), 0, 0, 1, "1month")
+
+    scheduled = plan.has_enough_capacity(Demand(90, "1min", "1day"))["scheduled_requests"]
+
+    assert len(scheduled) == 9600
+    assert scheduled[0] == {"id": 2, "scheduled_at": 0.6}
+    assert scheduled[-1] == {"id": 9601, "scheduled_at": 5760.0}
+    assert scheduled.times_ms()[-1] == 5760000
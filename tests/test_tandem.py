@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from APICompass.basic.bounded_rate import BoundedRate, Quota, Rate
+from APICompass.basic.tandem import compose_in_series, tandem_service_curve
+
+# Periodos anidados, en ms para que la convolución de referencia sea barata
+NESTED_PERIODS_MS = [5, 10, 20, 60, 120]
+HORIZON_MS = 480
+
+
+def _nested_stage(rng: np.random.Generator) -> BoundedRate:
+    periods = np.sort(rng.choice(NESTED_PERIODS_MS, size=int(rng.integers(1, 4)), replace=False))
+    units = int(rng.integers(1, 6))
+    rate = Rate(units, f"{periods[0]}ms")
+    quotas = []
+    for inner, outer in zip(periods, periods[1:]):
+        # cuota alcanzable a través del límite anterior
+        units = int(rng.integers(units + 1, units * outer // inner + 1))
+        quotas.append(Quota(units, f"{outer}ms"))
+    return BoundedRate(rate, quotas)
+
+
+def _stages():
+    rng = np.random.default_rng(7)
+    return [[_nested_stage(rng) for _ in range(int(rng.integers(2, 4)))] for _ in range(60)]
+
+
+@pytest.mark.parametrize("stages", _stages())
+def test_compose_in_series_matches_tandem_curve_for_nested_periods(stages):
+    composed = compose_in_series(stages)
+
+    tandem = tandem_service_curve(stages, f"{HORIZON_MS}ms")
+    merged = composed.show_available_capacity_curve(f"{HORIZON_MS}ms", debug=True)
+    t = np.union1d(tandem.breakpoints, merged.breakpoints)
+    t = t[t <= HORIZON_MS]
+    np.testing.assert_array_equal(merged.at_many(t), tandem.at_many(t))
+
+
+def test_compose_in_series_drops_quota_the_inner_limits_never_reach():
+    # 17 por 12 s dejan pasar 85 por minuto: la cuota de 86 no limita
+    stages = [BoundedRate(Rate(5, "1s"), Quota(86, "1min")), BoundedRate(Rate(2, "1s"), Quota(17, "12s"))]
+
+    composed = compose_in_series(stages)
+
+    assert composed == BoundedRate(Rate(2, "1s"), Quota(17, "12s"))
+    assert compose_in_series(stages, verify=True) == composed
+
+
+def test_compose_in_series_needs_verify_for_periods_that_do_not_divide():
+    stages = [BoundedRate(Rate(2, "3s")), BoundedRate(Rate(3, "5s"))]
+
+    with pytest.raises(ValueError, match="verify=True"):
+        compose_in_series(stages)
+    with pytest.raises(ValueError, match="tandem_service_curve"):
+        compose_in_series(stages, verify=True)